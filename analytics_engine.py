@@ -0,0 +1,159 @@
+# analytics_engine.py
+
+import numpy as np
+
+# Categorical action codes used in AttendanceEvents.action
+CHECK_IN = 0
+CHECK_OUT = 1
+ACTION_CODES = {'Check-In': CHECK_IN, 'Check-Out': CHECK_OUT}
+
+SECONDS_PER_DAY = 86400
+ON_TIME_BOUNDARY = 8 * 3600  # 8:00 AM, in seconds from midnight
+BUCKET_SECONDS = 15 * 60     # trend chart resolution
+
+class AttendanceEvents:
+    """Attendance punches stored column-wise as parallel NumPy arrays.
+
+    epoch          int64  seconds since 1970-01-01 (server local time)
+    action         int8   CHECK_IN / CHECK_OUT
+    faculty_index  int32  index into faculty_ids
+    faculty_ids / faculty_department map faculty indices to IDs and department indices,
+    department_names maps department indices to names.
+    """
+
+    def __init__(self, epoch, action, faculty_index, faculty_ids, faculty_department, department_names):
+        self.epoch = epoch
+        self.action = action
+        self.faculty_index = faculty_index
+        self.faculty_ids = faculty_ids
+        self.faculty_department = faculty_department
+        self.department_names = department_names
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Builds the arrays from (FacultyID, Department, EpochSeconds, Action) rows."""
+        if not rows:
+            return cls.empty()
+
+        fids, depts, epochs, actions = zip(*rows)
+        epoch = np.asarray(epochs, dtype=np.int64)
+
+        actions = np.asarray(actions)
+        action = np.full(len(actions), -1, dtype=np.int8)
+        for name, code in ACTION_CODES.items():
+            action[actions == name] = code
+
+        faculty_ids, faculty_index = np.unique(np.asarray(fids).astype(str), return_inverse=True)
+
+        depts = np.asarray(depts, dtype=object)
+        depts[depts == None] = "N/A"  # noqa: E711 - elementwise comparison
+        department_names, dept_index = np.unique(depts.astype(str), return_inverse=True)
+
+        faculty_department = np.zeros(len(faculty_ids), dtype=np.int32)
+        faculty_department[faculty_index] = dept_index
+
+        return cls(epoch, action, faculty_index.astype(np.int32), faculty_ids,
+                   faculty_department, department_names)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, np.int64), np.empty(0, np.int8), np.empty(0, np.int32),
+                   np.empty(0, str), np.empty(0, np.int32), np.empty(0, str))
+
+    def __len__(self):
+        return len(self.epoch)
+
+    def seconds_of_day(self):
+        return self.epoch % SECONDS_PER_DAY
+
+    def day_index(self):
+        return self.epoch // SECONDS_PER_DAY
+
+def _safe_mean(values):
+    return float(values.mean()) if len(values) else None
+
+def _ratio(part, whole):
+    """Elementwise part/whole * 100, with 0 where whole is 0."""
+    return np.divide(part * 100.0, whole, out=np.zeros(len(whole)), where=whole > 0)
+
+def summarize(events, on_time_boundary=ON_TIME_BOUNDARY, percentiles=(10, 50, 90)):
+    """Overall averages, rates, on-time percentage and check-in time percentiles."""
+    sod = events.seconds_of_day()
+    is_in = events.action == CHECK_IN
+    is_out = events.action == CHECK_OUT
+
+    in_sod = sod[is_in]
+    check_ins = int(is_in.sum())
+    check_outs = int(is_out.sum())
+    total = check_ins + check_outs
+    on_time = int((in_sod <= on_time_boundary).sum())
+
+    return {
+        'check_ins': check_ins,
+        'check_outs': check_outs,
+        'avg_in_sec': _safe_mean(in_sod),
+        'avg_out_sec': _safe_mean(sod[is_out]),
+        'in_rate': check_ins / total * 100 if total else 0,
+        'out_rate': check_outs / total * 100 if total else 0,
+        'on_time_percentage': on_time / check_ins * 100 if check_ins else 0,
+        'in_percentiles': dict(zip(percentiles, np.percentile(in_sod, percentiles).tolist())) if check_ins else {},
+    }
+
+def _group_stats(groups, group_count, events, on_time_boundary):
+    """Per-group check-in/out counts, average times and on-time rate via bincount."""
+    sod = events.seconds_of_day().astype(np.float64)
+    is_in = events.action == CHECK_IN
+    is_out = events.action == CHECK_OUT
+
+    check_ins = np.bincount(groups[is_in], minlength=group_count)
+    check_outs = np.bincount(groups[is_out], minlength=group_count)
+    in_sum = np.bincount(groups[is_in], weights=sod[is_in], minlength=group_count)
+    out_sum = np.bincount(groups[is_out], weights=sod[is_out], minlength=group_count)
+    on_time = np.bincount(groups[is_in & (sod <= on_time_boundary)], minlength=group_count)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_in = np.where(check_ins > 0, in_sum / check_ins, np.nan)
+        avg_out = np.where(check_outs > 0, out_sum / check_outs, np.nan)
+
+    return {
+        'check_ins': check_ins,
+        'check_outs': check_outs,
+        'avg_in_sec': avg_in,
+        'avg_out_sec': avg_out,
+        'on_time_percentage': _ratio(on_time, check_ins),
+    }
+
+def by_faculty(events, on_time_boundary=ON_TIME_BOUNDARY):
+    """Per-faculty stats; arrays are aligned with events.faculty_ids."""
+    stats = _group_stats(events.faculty_index, len(events.faculty_ids), events, on_time_boundary)
+    stats['faculty_ids'] = events.faculty_ids
+    return stats
+
+def by_department(events, on_time_boundary=ON_TIME_BOUNDARY):
+    """Per-department stats; arrays are aligned with events.department_names."""
+    groups = events.faculty_department[events.faculty_index]
+    stats = _group_stats(groups, len(events.department_names), events, on_time_boundary)
+    stats['departments'] = events.department_names
+    return stats
+
+def by_day(events, on_time_boundary=ON_TIME_BOUNDARY):
+    """Per-calendar-day stats over the loaded range; 'days' holds epoch-day numbers."""
+    day_index = events.day_index()
+    days, groups = np.unique(day_index, return_inverse=True)
+    stats = _group_stats(groups, len(days), events, on_time_boundary)
+    stats['days'] = days
+    return stats
+
+def by_time_of_day(events, bucket_seconds=BUCKET_SECONDS):
+    """Check-in and check-out counts per time-of-day bucket (96 quarter-hours by default).
+
+    Over a single day this is the punch timeline; over a longer range it is the
+    typical arrival/departure profile.
+    """
+    bucket_count = SECONDS_PER_DAY // bucket_seconds
+    buckets = events.seconds_of_day() // bucket_seconds
+    return {
+        'bucket_start_sec': np.arange(bucket_count) * bucket_seconds,
+        'check_ins': np.bincount(buckets[events.action == CHECK_IN], minlength=bucket_count),
+        'check_outs': np.bincount(buckets[events.action == CHECK_OUT], minlength=bucket_count),
+    }
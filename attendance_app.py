@@ -1,355 +1,1077 @@
-# attendance_app.py
-
-import tkinter as tk
-from tkinter import messagebox, ttk
-from db_manager import DatabaseManager
-from datetime import timedelta, datetime, time
-import matplotlib.pyplot as plt
-import numpy as np 
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-# Define professional fonts
-LARGE_FONT = ('Arial', 35, 'bold') 
-MEDIUM_FONT = ('Arial', 25, 'bold')
-INPUT_FONT = ('Arial', 16)
-SMALL_FONT = ('Arial', 12)
-
-class AttendanceApp(tk.Tk):
-    """Main GUI Application using Tkinter and pyodbc for MSSQL."""
-
-    def __init__(self):
-        super().__init__()
-        self.title("Faculty Attendance System - MSSQL Edition")
-        self.geometry("800x600") 
-        
-        self.grid_rowconfigure(0, weight=1)
-        self.grid_columnconfigure(0, weight=1)
-
-        # --- DB Manager Initialization ---
-        # Using a RAW STRING to correctly handle the backslash in the instance name.
-        self.db_manager = DatabaseManager(server=r'sql.bsite.net\MSSQL2016', database='aspnetfp_') 
-
-        container = tk.Frame(self)
-        container.grid(row=0, column=0, sticky='nsew')
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
-
-        self.frames = {}
-        
-        for F in (AttendanceFrame, AddFacultyFrame, ReportFrame, AnalyticsFrame): 
-            page_name = F.__name__
-            frame = F(parent=container, controller=self)
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew") 
-
-        self.create_navigation_menu()
-        self.show_frame("AttendanceFrame")
-
-    def create_navigation_menu(self):
-        """Creates the navigation menu bar at the top with enlarged fonts."""
-        menu_bar = tk.Menu(self)
-        self.config(menu=menu_bar)
-
-        file_menu = tk.Menu(menu_bar, tearoff=0, font=MEDIUM_FONT) 
-        menu_bar.add_cascade(label="Navigation", menu=file_menu, font=MEDIUM_FONT) 
-
-        file_menu.add_command(label="1. Attendance (In/Out)", command=lambda: self.show_frame("AttendanceFrame"))
-        file_menu.add_command(label="2. Add Faculty", command=lambda: self.show_frame("AddFacultyFrame"))
-        file_menu.add_command(label="3. View Report", command=lambda: self.show_frame("ReportFrame"))
-        file_menu.add_command(label="4. View Analytics", command=lambda: self.show_frame("AnalyticsFrame"))
-        file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.quit)
-
-    def show_frame(self, page_name):
-        """Brings the requested frame to the front and triggers refresh if needed."""
-        frame = self.frames[page_name]
-        if page_name == "ReportFrame":
-            frame.refresh_report() 
-        elif page_name == "AnalyticsFrame":
-            frame.generate_analytics()
-        frame.tkraise()
-
-# --- FRAME 1: ATTENDANCE (Check In/Out - VERTICAL BUTTONS) ---
-class AttendanceFrame(tk.Frame):
-    def __init__(self, parent, controller):
-        super().__init__(parent)
-        self.controller = controller
-        
-        self.grid_rowconfigure(0, weight=0)
-        self.grid_rowconfigure(1, weight=0)
-        self.grid_rowconfigure(2, weight=1) 
-        self.grid_rowconfigure(3, weight=1) 
-        self.grid_columnconfigure(0, weight=1) 
-
-        tk.Label(self, text="Faculty Attendance (Check In/Out)", font=LARGE_FONT).grid(row=0, column=0, pady=30, padx=20, sticky='ew')
-        
-        input_frame = tk.Frame(self)
-        input_frame.grid(row=1, column=0, pady=10, sticky='ew')
-        input_frame.grid_columnconfigure(1, weight=1)
-        
-        tk.Label(input_frame, text="Faculty ID:", font=MEDIUM_FONT).grid(row=0, column=0, padx=10, pady=10, sticky='w')
-        self.id_entry = tk.Entry(input_frame, font=INPUT_FONT)
-        self.id_entry.grid(row=0, column=1, padx=10, pady=10, sticky='ew')
-
-        # --- Button Placement (VERTICAL STACK - Smaller, Resizeable) ---
-        
-        check_in_btn = tk.Button(self, text="CHECK IN", font=MEDIUM_FONT, bg='green', fg='white', 
-                                 command=lambda: self.check_in_out("Check-In"))
-        check_in_btn.grid(row=2, column=0, padx=200, pady=10, sticky='nsew') 
-
-        check_out_btn = tk.Button(self, text="CHECK OUT", font=MEDIUM_FONT, bg='red', fg='white', 
-                                  command=lambda: self.check_in_out("Check-Out"))
-        check_out_btn.grid(row=3, column=0, padx=200, pady=10, sticky='nsew')
-
-    def check_in_out(self, action):
-        faculty_id = self.id_entry.get().strip()
-
-        if not faculty_id:
-            messagebox.showwarning("Input Error", "Please enter Faculty ID.")
-            return
-
-        faculty_obj = self.controller.db_manager.load_faculty_info(faculty_id)
-
-        if not faculty_obj:
-            messagebox.showerror("Validation Error", f"Faculty ID '{faculty_id}' not found.")
-            return
-
-        sql = "INSERT INTO dbo.Attendance (FacultyID, Action) VALUES (?, ?)"
-        params = (faculty_id, action)
-
-        success, result = self.controller.db_manager.execute_non_query(sql, params)
-
-        if success:
-            messagebox.showinfo("Success", f"Attendance for {faculty_obj.full_name} has been recorded.\nAction: {action}.")
-        else:
-            messagebox.showerror("Error", f"Failed to record {action}. DB Error: {result}")
-
-        self.id_entry.delete(0, tk.END) 
-
-# --- FRAME 2: ADD FACULTY ---
-class AddFacultyFrame(tk.Frame):
-    def __init__(self, parent, controller):
-        super().__init__(parent)
-        self.controller = controller
-        
-        self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(0, weight=0)
-        self.grid_rowconfigure(3, weight=0)
-        self.grid_rowconfigure(4, weight=1)
-
-        tk.Label(self, text="Add New Faculty Member", font=LARGE_FONT).grid(row=0, column=0, pady=30, padx=20, sticky='ew')
-
-        input_frame = tk.Frame(self)
-        input_frame.grid(row=1, column=0, pady=10, sticky='ew')
-        input_frame.grid_columnconfigure(1, weight=1)
-        
-        tk.Label(input_frame, text="Faculty ID:", font=MEDIUM_FONT).grid(row=0, column=0, padx=10, pady=10, sticky='w')
-        self.id_entry = tk.Entry(input_frame, font=INPUT_FONT)
-        self.id_entry.grid(row=0, column=1, padx=10, pady=10, sticky='ew')
-
-        tk.Label(input_frame, text="Full Name:", font=MEDIUM_FONT).grid(row=1, column=0, padx=10, pady=10, sticky='w')
-        self.name_entry = tk.Entry(input_frame, font=INPUT_FONT)
-        self.name_entry.grid(row=1, column=1, padx=10, pady=10, sticky='ew')
-        
-        tk.Label(input_frame, text="Department:", font=MEDIUM_FONT).grid(row=2, column=0, padx=10, pady=10, sticky='w')
-        self.dept_entry = tk.Entry(input_frame, font=INPUT_FONT)
-        self.dept_entry.grid(row=2, column=1, padx=10, pady=10, sticky='ew')
-
-        tk.Button(self, text="ADD FACULTY", font=MEDIUM_FONT, bg='blue', fg='white', 
-                  command=self.add_worker_to_db).grid(row=3, column=0, pady=20, padx=200, sticky='ew')
-    
-    def add_worker_to_db(self):
-        faculty_id = self.id_entry.get().strip()
-        full_name = self.name_entry.get().strip()
-        department = self.dept_entry.get().strip()
-        
-        if not all([faculty_id, full_name, department]):
-            messagebox.showwarning("Input Error", "All fields are required.")
-            return
-
-        success, result = self.controller.db_manager.add_faculty(faculty_id, full_name, department)
-
-        if success:
-            messagebox.showinfo("Success", f"Faculty {full_name} (ID: {faculty_id}) added successfully.")
-            self.id_entry.delete(0, tk.END)
-            self.name_entry.delete(0, tk.END)
-            self.dept_entry.delete(0, tk.END)
-        else:
-            messagebox.showerror("Error", f"Failed to add faculty. Error: {result}")
-
-# --- FRAME 3: REPORT VIEW ---
-class ReportFrame(tk.Frame):
-    def __init__(self, parent, controller):
-        super().__init__(parent)
-        self.controller = controller
-        
-        self.grid_rowconfigure(1, weight=1)
-        self.grid_columnconfigure(0, weight=1)
-        
-        tk.Label(self, text="Attendance Status Report", font=LARGE_FONT).grid(row=0, column=0, pady=20, sticky='ew')
-        
-        style = ttk.Style()
-        style.configure("Treeview.Heading", font=(SMALL_FONT[0], SMALL_FONT[1], 'bold'))
-        style.configure("Treeview", font=SMALL_FONT, rowheight=25) 
-        
-        self.tree = ttk.Treeview(self, columns=('ID', 'Name', 'Last Action', 'Hours', 'Note'), show='headings')
-        self.tree.heading('ID', text='ID')
-        self.tree.heading('Name', text='Name')
-        self.tree.heading('Last Action', text='Last Action')
-        self.tree.heading('Hours', text='Hours Rendered')
-        self.tree.heading('Note', text='8-Hour Status')
-        
-        self.tree.column('ID', width=80)
-        self.tree.column('Name', width=200)
-        self.tree.column('Last Action', width=150)
-        self.tree.column('Hours', width=120)
-        self.tree.column('Note', width=150)
-        
-        self.tree.grid(row=1, column=0, sticky='nsew', padx=10, pady=10) 
-        
-    def refresh_report(self):
-        """Clears old data and loads the latest report from the database."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        report_data = self.controller.db_manager.get_attendance_report()
-        
-        for record in report_data:
-            hours = f"{record['HoursRendered'].total_seconds() / 3600:.2f} hrs" if record['HoursRendered'] else "N/A"
-            action_time_str = record['LastActionTime'].strftime('%H:%M:%S %m/%d') if record['LastActionTime'] else "N/A"
-
-            self.tree.insert('', tk.END, values=(
-                record['FacultyID'],
-                record['FullName'],
-                f"{record['LastAction']} @ {action_time_str}" if record['LastAction'] else record['Note'],
-                hours,
-                record['Note']
-            ))
-
-# --- FRAME 4: ANALYTICS & GRAPHS ---
-class AnalyticsFrame(tk.Frame):
-    def __init__(self, parent, controller):
-        super().__init__(parent)
-        self.controller = controller 
-        
-        self.grid_rowconfigure(1, weight=1)
-        self.grid_columnconfigure(0, weight=1)
-
-        tk.Label(self, text="Attendance Analytics & Visualization", font=LARGE_FONT).grid(row=0, column=0, pady=15, sticky='ew')
-        
-        self.chart_frame = tk.Frame(self)
-        self.chart_frame.grid(row=1, column=0, sticky='nsew', padx=10, pady=10)
-        
-        self.chart_frame.grid_rowconfigure(0, weight=1)
-        self.chart_frame.grid_columnconfigure(0, weight=1)
-        
-        self.text_output = tk.Text(self.chart_frame, height=8, state=tk.DISABLED, font=SMALL_FONT)
-        self.text_output.grid(row=1, column=0, sticky='ew', pady=(10, 0))
-
-        self.fig, self.ax = plt.subplots(figsize=(6, 4))
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.chart_frame)
-        self.canvas_widget = self.canvas.get_tk_widget()
-        
-        self.canvas_widget.grid(row=0, column=0, sticky='nsew') 
-
-    def calculate_stats(self, data):
-        """Calculates average times, rates, and on-time percentage."""
-        all_check_in_times = []
-        all_check_out_times = []
-        on_time_count = 0
-        total_check_ins = 0
-        
-        ON_TIME_BOUNDARY = time(8, 0, 0)
-
-        for fid, times in data.items():
-            total_check_ins += len(times['check_ins'])
-            
-            for t_in in times['check_ins']:
-                time_only = t_in.time()
-                all_check_in_times.append(time_only)
-                
-                if time_only <= ON_TIME_BOUNDARY:
-                    on_time_count += 1
-
-            all_check_out_times.extend(times['check_outs'])
-        
-        avg_in_sec, avg_out_sec = None, None
-        
-        if all_check_in_times:
-            in_seconds = [t.hour * 3600 + t.minute * 60 + t.second for t in all_check_in_times]
-            avg_in_sec = np.mean(in_seconds)
-
-        if all_check_out_times:
-            out_seconds = [t.hour * 3600 + t.minute * 60 + t.second for t in all_check_out_times]
-            avg_out_sec = np.mean(out_seconds)
-
-        total_events = total_check_ins + len(all_check_out_times)
-        in_rate = (total_check_ins / total_events) * 100 if total_events > 0 else 0
-        out_rate = (len(all_check_out_times) / total_events) * 100 if total_events > 0 else 0
-        
-        on_time_percentage = (on_time_count / total_check_ins) * 100 if total_check_ins > 0 else 0
-
-        return avg_in_sec, avg_out_sec, in_rate, out_rate, on_time_percentage
-        
-    def format_seconds_to_time(self, seconds):
-        """Converts total seconds back to HH:MM:SS format."""
-        if seconds is None: return "N/A"
-        h = int(seconds // 3600)
-        m = int((seconds % 3600) // 60)
-        s = int(seconds % 60)
-        return f"{h:02d}:{m:02d}:{s:02d}"
-
-    def generate_analytics(self):
-        """Fetches data, calculates stats, and plots/displays results."""
-        raw_data = self.controller.db_manager.get_raw_time_data()
-        
-        if not raw_data:
-            self.update_text_output("No attendance data found for today to generate analytics.")
-            self.ax.clear()
-            self.ax.text(0.5, 0.5, "No Data Today", ha='center', va='center')
-            self.canvas.draw()
-            return
-            
-        avg_in_sec, avg_out_sec, in_rate, out_rate, on_time_percentage = self.calculate_stats(raw_data)
-
-        # 1. Plotting Average Time In and Time Out
-        self.ax.clear()
-        times = [t for t in [avg_in_sec, avg_out_sec] if t is not None]
-        labels = [l for l, t in zip(['Avg. Check In', 'Avg. Check Out'], [avg_in_sec, avg_out_sec]) if t is not None]
-        
-        self.ax.bar(labels, times, color=['skyblue', 'salmon']) 
-        self.ax.set_ylabel('Time (Seconds from Midnight)')
-        self.ax.set_title('Average Time In/Out Today') 
-
-        for i, val in enumerate(times):
-             self.ax.text(i, val + 500, self.format_seconds_to_time(val), ha='center', va='bottom', fontsize=9)
-
-        self.canvas.draw()
-        
-        # 2. Text Output (Rates and Percentage)
-        in_time_formatted = self.format_seconds_to_time(avg_in_sec)
-        out_time_formatted = self.format_seconds_to_time(avg_out_sec)
-        
-        report_text = f"""
-        --- Daily Attendance Analytics ({datetime.now().strftime('%Y-%m-%d')}) ---
-        Average Check-In Time:    {in_time_formatted}
-        Average Check-Out Time:   {out_time_formatted}
-        
-        Rate of Time In Events:   {in_rate:.2f}% (Total check-ins vs. all events)
-        Rate of Time Out Events:  {out_rate:.2f}% (Total check-outs vs. all events)
-        
-        Percentage On-Time/Early: {on_time_percentage:.2f}% (Checked in at or before 8:00 AM)
-        """
-        self.update_text_output(report_text)
-        
-    def update_text_output(self, text):
-        """Helper function to update the read-only text box."""
-        self.text_output.config(state=tk.NORMAL)
-        self.text_output.delete('1.0', tk.END)
-        self.text_output.insert(tk.END, text)
-        self.text_output.config(state=tk.DISABLED)
-
-
-if __name__ == "__main__":
-    app = AttendanceApp()
-    app.mainloop()
\ No newline at end of file
+# attendance_app.py
+
+import time
+_IMPORT_START = time.perf_counter()
+
+import argparse
+import functools
+import json
+import logging
+import os
+import sys
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+from db_manager import DatabaseManager, DEFAULT_SERVER, DEFAULT_DATABASE, day_bounds
+from punch_journal import PunchJournal
+from punch_index import PunchIndex
+from roster_cache import RosterCache
+from faculty_import import import_faculty_csv
+from attendance_export import export_attendance
+from rollup import RollupManager
+from backends import SQLiteBackend
+from checkin_service import CheckInService
+from task_runner import TaskRunner
+from report_pager import ReportPager
+from datetime import datetime
+# matplotlib, numpy and analytics_engine are imported on first use (see load_plotting).
+
+_IMPORTS_DONE = time.perf_counter()
+
+# Define professional fonts
+LARGE_FONT = ('Arial', 35, 'bold') 
+MEDIUM_FONT = ('Arial', 25, 'bold')
+INPUT_FONT = ('Arial', 16)
+SMALL_FONT = ('Arial', 12)
+
+def load_plotting():
+    """Imports the charting stack; returns (Figure, FigureCanvasTkAgg). Safe to call from a worker thread."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    import analytics_engine  # noqa: F401 -- pulls in numpy
+    return Figure, FigureCanvasTkAgg
+
+class AttendanceApp(tk.Tk):
+    """Main GUI Application using Tkinter and pyodbc for MSSQL."""
+
+    # Delay before pre-warming, so the attendance screen is usable first.
+    PREWARM_DELAY_MS = 1500
+    # Longest a cached report/analytics result is reused when another kiosk or gate may have written since.
+    CACHE_MAX_STALENESS = 10.0
+
+    def __init__(self, db_manager=None, prewarm=True):
+        init_start = time.perf_counter()
+        super().__init__()
+        self.title("Faculty Attendance System - MSSQL Edition")
+        self.geometry("800x600") 
+        
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # --- DB Manager Initialization ---
+        # Connections are pooled and reused, so a check-in no longer pays for a fresh ODBC handshake.
+        self.db_manager = db_manager or DatabaseManager(server=DEFAULT_SERVER, database=DEFAULT_DATABASE,
+                                                        pool_size=4, use_rollups=True,
+                                                        slow_log_path='slow_queries.log',
+                                                        cache_max_staleness=self.CACHE_MAX_STALENESS) 
+
+        # Punches go to a local journal first and are flushed to dbo.Attendance in the background.
+        self.journal = PunchJournal(self.db_manager)
+
+        # Daily summaries (dbo.AttendanceDaily) are updated as each flushed batch lands.
+        # Faculty-days still to be summarized after a failed refresh are kept in the journal file.
+        self.rollups = RollupManager(self.db_manager, state_path=self.journal.path)
+        self.journal.listeners.append(self.rollups.on_punches_flushed)
+        self.journal.drained_listeners.append(self.rollups.retry_pending)
+        self.journal.start()
+
+        # All database work runs on background workers; results come back via after().
+        self.tasks = TaskRunner(self)
+
+        # Punch validation reads the roster from memory; warm it up without blocking the window.
+        self.roster = RosterCache(self.db_manager)
+        self.tasks.submit(None, self.roster.warm_up)
+
+        # Each faculty's last punch, so double taps are caught without a round trip.
+        # Seeded and kept in step with other kiosks/gates by its own sync thread.
+        self.punch_index = PunchIndex(self.db_manager, self.journal)
+        self.punch_index.start()
+
+        # Punch logic shared with the headless gate service (checkin_server.py).
+        self.checkin_service = CheckInService(self.roster, self.journal, self.punch_index)
+
+        self.container = tk.Frame(self)
+        self.container.grid(row=0, column=0, sticky='nsew')
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+
+        # Screens are built the first time they are shown; most kiosk sessions only need the first one.
+        self.frame_classes = {F.__name__: F for F in
+                              (AttendanceFrame, AddFacultyFrame, ReportFrame, AnalyticsFrame, DiagnosticsFrame)}
+        self.frames = {}
+        self.current_frame = None
+
+        self.create_navigation_menu()
+        self.show_frame("AttendanceFrame")
+
+        if prewarm:
+            self.after(self.PREWARM_DELAY_MS, self.prewarm)
+
+        self.startup = {'imports_ms': round((_IMPORTS_DONE - _IMPORT_START) * 1000, 1),
+                        'init_ms': round((time.perf_counter() - init_start) * 1000, 1)}
+
+    def create_navigation_menu(self):
+        """Creates the navigation menu bar at the top with enlarged fonts."""
+        menu_bar = tk.Menu(self)
+        self.config(menu=menu_bar)
+
+        file_menu = tk.Menu(menu_bar, tearoff=0, font=MEDIUM_FONT) 
+        menu_bar.add_cascade(label="Navigation", menu=file_menu, font=MEDIUM_FONT) 
+
+        file_menu.add_command(label="1. Attendance (In/Out)", command=lambda: self.show_frame("AttendanceFrame"))
+        file_menu.add_command(label="2. Add Faculty", command=lambda: self.show_frame("AddFacultyFrame"))
+        file_menu.add_command(label="3. View Report", command=lambda: self.show_frame("ReportFrame"))
+        file_menu.add_command(label="4. View Analytics", command=lambda: self.show_frame("AnalyticsFrame"))
+        file_menu.add_command(label="5. Diagnostics", command=lambda: self.show_frame("DiagnosticsFrame"))
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self.quit)
+
+    def get_frame(self, page_name):
+        """Returns the frame for page_name, building it on first use."""
+        frame = self.frames.get(page_name)
+        if frame is None:
+            frame = self.frame_classes[page_name](parent=self.container, controller=self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[page_name] = frame
+        return frame
+
+    def show_frame(self, page_name):
+        """Brings the requested frame to the front and triggers refresh if needed."""
+        # Results for a screen the user has left are no longer wanted.
+        if self.current_frame and self.current_frame != page_name:
+            self.tasks.cancel(self.current_frame)
+        self.current_frame = page_name
+
+        frame = self.get_frame(page_name)
+        if page_name == "ReportFrame":
+            frame.refresh_report() 
+        elif page_name == "AnalyticsFrame":
+            frame.generate_analytics()
+        elif page_name == "DiagnosticsFrame":
+            frame.refresh_stats()
+        frame.tkraise()
+
+    def prewarm(self):
+        """Imports the charting libraries on a worker, then builds the remaining screens while idle."""
+        self.tasks.submit(None, load_plotting, on_success=lambda _: self.after_idle(self.build_next_frame))
+
+    def build_next_frame(self):
+        pending = [name for name in self.frame_classes if name not in self.frames]
+        if not pending:
+            return
+        self.get_frame(pending[0])
+        # A newly gridded frame stacks on top; keep the user's screen in front.
+        self.frames[self.current_frame].tkraise()
+        self.after(50, self.build_next_frame)
+
+    def report_startup(self):
+        """Prints startup timings as JSON once the window has been drawn, then exits (--measure-startup)."""
+        self.update()
+        self.startup.update({
+            'interactive_ms': round((time.perf_counter() - _IMPORT_START) * 1000, 1),
+            'frames_built': sorted(self.frames),
+            'matplotlib_loaded': 'matplotlib' in sys.modules,
+            'numpy_loaded': 'numpy' in sys.modules,
+        })
+        print(json.dumps(self.startup))
+        self.quit()
+
+# --- FRAME 1: ATTENDANCE (Check In/Out - VERTICAL BUTTONS) ---
+class AttendanceFrame(tk.Frame):
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        
+        self.grid_rowconfigure(0, weight=0)
+        self.grid_rowconfigure(1, weight=0)
+        self.grid_rowconfigure(2, weight=1) 
+        self.grid_rowconfigure(3, weight=1) 
+        self.grid_columnconfigure(0, weight=1) 
+
+        tk.Label(self, text="Faculty Attendance (Check In/Out)", font=LARGE_FONT).grid(row=0, column=0, pady=30, padx=20, sticky='ew')
+        
+        input_frame = tk.Frame(self)
+        input_frame.grid(row=1, column=0, pady=10, sticky='ew')
+        input_frame.grid_columnconfigure(1, weight=1)
+        
+        tk.Label(input_frame, text="Faculty ID:", font=MEDIUM_FONT).grid(row=0, column=0, padx=10, pady=10, sticky='w')
+        self.id_entry = tk.Entry(input_frame, font=INPUT_FONT)
+        self.id_entry.grid(row=0, column=1, padx=10, pady=10, sticky='ew')
+
+        # --- Button Placement (VERTICAL STACK - Smaller, Resizeable) ---
+        
+        check_in_btn = tk.Button(self, text="CHECK IN", font=MEDIUM_FONT, bg='green', fg='white', 
+                                 command=lambda: self.check_in_out("Check-In"))
+        check_in_btn.grid(row=2, column=0, padx=200, pady=10, sticky='nsew') 
+
+        check_out_btn = tk.Button(self, text="CHECK OUT", font=MEDIUM_FONT, bg='red', fg='white', 
+                                  command=lambda: self.check_in_out("Check-Out"))
+        check_out_btn.grid(row=3, column=0, padx=200, pady=10, sticky='nsew')
+
+    def check_in_out(self, action):
+        faculty_id = self.id_entry.get().strip()
+
+        if not faculty_id:
+            messagebox.showwarning("Input Error", "Please enter Faculty ID.")
+            return
+
+        # A roster cache miss still needs a round trip, so validate off the UI thread.
+        self.controller.tasks.submit(None, self.record_punch, faculty_id, action,
+                                     on_success=self.show_punch_result)
+
+    def record_punch(self, faculty_id, action):
+        """Runs on a worker thread. Returns a PunchResult."""
+        return self.controller.checkin_service.punch(faculty_id, action)
+
+    def show_punch_result(self, result):
+        if result.status == 'invalid':
+            messagebox.showwarning("Input Error", result.message)
+            return
+        if result.status == 'not_found':
+            messagebox.showerror("Validation Error", result.message)
+            return
+
+        if result.status == 'duplicate':
+            messagebox.showinfo("Already Recorded", result.message)
+        elif result.ok and result.warning:
+            messagebox.showwarning("Recorded - Please Check", result.message)
+        elif result.ok:
+            messagebox.showinfo("Success", result.message)
+        else:
+            messagebox.showerror("Error", result.message)
+
+        self.id_entry.delete(0, tk.END) 
+
+# --- FRAME 2: ADD FACULTY ---
+class AddFacultyFrame(tk.Frame):
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=0)
+        self.grid_rowconfigure(3, weight=0)
+        self.grid_rowconfigure(4, weight=1)
+
+        tk.Label(self, text="Add New Faculty Member", font=LARGE_FONT).grid(row=0, column=0, pady=30, padx=20, sticky='ew')
+
+        input_frame = tk.Frame(self)
+        input_frame.grid(row=1, column=0, pady=10, sticky='ew')
+        input_frame.grid_columnconfigure(1, weight=1)
+        
+        tk.Label(input_frame, text="Faculty ID:", font=MEDIUM_FONT).grid(row=0, column=0, padx=10, pady=10, sticky='w')
+        self.id_entry = tk.Entry(input_frame, font=INPUT_FONT)
+        self.id_entry.grid(row=0, column=1, padx=10, pady=10, sticky='ew')
+
+        tk.Label(input_frame, text="Full Name:", font=MEDIUM_FONT).grid(row=1, column=0, padx=10, pady=10, sticky='w')
+        self.name_entry = tk.Entry(input_frame, font=INPUT_FONT)
+        self.name_entry.grid(row=1, column=1, padx=10, pady=10, sticky='ew')
+        
+        tk.Label(input_frame, text="Department:", font=MEDIUM_FONT).grid(row=2, column=0, padx=10, pady=10, sticky='w')
+        self.dept_entry = tk.Entry(input_frame, font=INPUT_FONT)
+        self.dept_entry.grid(row=2, column=1, padx=10, pady=10, sticky='ew')
+
+        tk.Button(self, text="ADD FACULTY", font=MEDIUM_FONT, bg='blue', fg='white', 
+                  command=self.add_worker_to_db).grid(row=3, column=0, pady=20, padx=200, sticky='ew')
+
+        # Bulk onboarding: a whole roster CSV in chunked, set-based batches.
+        import_frame = tk.Frame(self)
+        import_frame.grid(row=4, column=0, sticky='n')
+        self.import_btn = tk.Button(import_frame, text="IMPORT CSV...", font=SMALL_FONT, command=self.import_csv)
+        self.import_btn.grid(row=0, column=0, padx=10)
+        self.import_status = tk.Label(import_frame, text="", font=SMALL_FONT, fg='gray')
+        self.import_status.grid(row=0, column=1, padx=10)
+    
+    def add_worker_to_db(self):
+        faculty_id = self.id_entry.get().strip()
+        full_name = self.name_entry.get().strip()
+        department = self.dept_entry.get().strip()
+        
+        if not all([faculty_id, full_name, department]):
+            messagebox.showwarning("Input Error", "All fields are required.")
+            return
+
+        self.controller.tasks.submit(None, self.controller.roster.add_faculty, faculty_id, full_name, department,
+                                     on_success=lambda outcome: self.show_add_result(outcome, faculty_id, full_name))
+
+    def show_add_result(self, outcome, faculty_id, full_name):
+        success, result = outcome
+
+        if success:
+            messagebox.showinfo("Success", f"Faculty {full_name} (ID: {faculty_id}) added successfully.")
+            self.id_entry.delete(0, tk.END)
+            self.name_entry.delete(0, tk.END)
+            self.dept_entry.delete(0, tk.END)
+        else:
+            messagebox.showerror("Error", f"Failed to add faculty. Error: {result}")
+
+    def import_csv(self):
+        csv_path = filedialog.askopenfilename(title="Import Faculty CSV",
+                                              filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not csv_path:
+            return
+
+        tasks = self.controller.tasks
+        self.import_btn.config(state=tk.DISABLED)
+        self.import_status.config(text="Importing...")
+        tasks.submit(None, import_faculty_csv, self.controller.db_manager, csv_path,
+                     None, self.controller.roster,
+                     lambda done, ok, bad: tasks.post(self.show_import_progress, done, ok, bad),
+                     on_success=self.show_import_result, on_error=self.show_import_error)
+
+    def show_import_progress(self, done, added, failed):
+        self.import_status.config(text=f"{done} rows processed ({added} added, {failed} failed)")
+
+    def show_import_result(self, result):
+        added, failed, report_path = result
+        self.import_btn.config(state=tk.NORMAL)
+        self.import_status.config(text=f"Import finished: {added} added, {failed} failed")
+        messagebox.showinfo("Import Finished", f"{added} faculty added, {failed} failed.\nReport: {report_path}")
+
+    def show_import_error(self, err):
+        self.import_btn.config(state=tk.NORMAL)
+        self.import_status.config(text="Import failed")
+        messagebox.showerror("Error", f"Failed to import faculty. Error: {err}")
+
+# --- FRAME 3: REPORT VIEW ---
+class ReportFrame(tk.Frame):
+    """Attendance report for the whole roster, paged from the server.
+
+    Only a few pages of rows live in the Treeview at once (see ReportPager);
+    sorting, filtering and search all run in SQL, so large rosters stay fast.
+    """
+
+    # Column -> sort key for get_report_page, for the sortable headings.
+    SORTABLE = {'ID': 'id', 'Name': 'name', 'Department': 'department', 'Note': 'status'}
+    STATUS_FILTERS = {"All": None, "No Records": 0, "Time-In": 1, "Not Done": 2, "Properly Done": 3}
+    SEARCH_DELAY_MS = 300
+
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        
+        self.grid_rowconfigure(2, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        
+        tk.Label(self, text="Attendance Status Report", font=LARGE_FONT).grid(row=0, column=0, pady=20, sticky='ew')
+
+        filter_frame = tk.Frame(self)
+        filter_frame.grid(row=1, column=0, sticky='ew', padx=10)
+
+        tk.Label(filter_frame, text="Search:", font=SMALL_FONT).pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', lambda *_: self.schedule_search())
+        tk.Entry(filter_frame, textvariable=self.search_var, font=SMALL_FONT, width=25).pack(side=tk.LEFT, padx=(5, 15))
+
+        tk.Label(filter_frame, text="Department:", font=SMALL_FONT).pack(side=tk.LEFT)
+        self.department_var = tk.StringVar(value="All")
+        self.department_box = ttk.Combobox(filter_frame, textvariable=self.department_var, values=["All"],
+                                           state='readonly', width=18)
+        self.department_box.bind('<<ComboboxSelected>>', lambda _: self.apply_filters())
+        self.department_box.pack(side=tk.LEFT, padx=(5, 15))
+
+        tk.Label(filter_frame, text="Status:", font=SMALL_FONT).pack(side=tk.LEFT)
+        self.status_var = tk.StringVar(value="All")
+        status_box = ttk.Combobox(filter_frame, textvariable=self.status_var, values=list(self.STATUS_FILTERS),
+                                  state='readonly', width=14)
+        status_box.bind('<<ComboboxSelected>>', lambda _: self.apply_filters())
+        status_box.pack(side=tk.LEFT, padx=5)
+        
+        style = ttk.Style()
+        style.configure("Treeview.Heading", font=(SMALL_FONT[0], SMALL_FONT[1], 'bold'))
+        style.configure("Treeview", font=SMALL_FONT, rowheight=25) 
+
+        tree_frame = tk.Frame(self)
+        tree_frame.grid(row=2, column=0, sticky='nsew', padx=10, pady=10)
+        tree_frame.grid_rowconfigure(0, weight=1)
+        tree_frame.grid_columnconfigure(0, weight=1)
+        
+        self.tree = ttk.Treeview(tree_frame, columns=('ID', 'Name', 'Department', 'Last Action', 'Hours', 'Note'),
+                                 show='headings', yscrollcommand=self.on_tree_scroll)
+        self.headings = {'ID': 'ID', 'Name': 'Name', 'Department': 'Department', 'Last Action': 'Last Action',
+                         'Hours': 'Hours Rendered', 'Note': '8-Hour Status'}
+        for column, text in self.headings.items():
+            command = (lambda c=column: self.sort_by(c)) if column in self.SORTABLE else ''
+            self.tree.heading(column, text=text, command=command)
+        
+        self.tree.column('ID', width=80)
+        self.tree.column('Name', width=200)
+        self.tree.column('Department', width=130)
+        self.tree.column('Last Action', width=150)
+        self.tree.column('Hours', width=120)
+        self.tree.column('Note', width=150)
+        
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+
+        bottom_frame = tk.Frame(self)
+        bottom_frame.grid(row=3, column=0, sticky='ew', padx=10)
+        bottom_frame.grid_columnconfigure(0, weight=1)
+
+        self.status_label = tk.Label(bottom_frame, text="", font=SMALL_FONT, fg='gray')
+        self.status_label.grid(row=0, column=0, sticky='w')
+
+        self.export_btn = tk.Button(bottom_frame, text="EXPORT HISTORY...", font=SMALL_FONT, command=self.export_history)
+        self.export_btn.grid(row=0, column=1, sticky='e')
+
+        self.pager = ReportPager(controller.db_manager)
+        self.total = None
+        self.loading = False
+        self.search_job = None
+        self.update_headings()
+        
+    def refresh_report(self):
+        """Re-reads the rows on screen, or the first page on the first visit."""
+        self.status_label.config(text="Loading report...")
+        if len(self.department_box['values']) == 1:
+            self.controller.tasks.submit(None, self.controller.db_manager.get_departments,
+                                         on_success=self.set_departments)
+        self.request_page(self.pager.reload_request() if self.pager.rows else self.pager.first_request())
+        self.request_count()
+
+    def set_departments(self, departments):
+        self.department_box['values'] = ["All"] + departments
+
+    # --- Sorting, filtering and search ---
+    def sort_by(self, column):
+        sort = self.SORTABLE[column]
+        query = self.pager.query
+        self.pager.set_query(sort=sort, descending=not query['descending'] if query['sort'] == sort else False)
+        self.update_headings()
+        self.request_page(self.pager.first_request())
+
+    def update_headings(self):
+        query = self.pager.query
+        for column, sort in self.SORTABLE.items():
+            arrow = (" \u25BC" if query['descending'] else " \u25B2") if query['sort'] == sort else ""
+            self.tree.heading(column, text=self.headings[column] + arrow)
+
+    def schedule_search(self):
+        """Search as you type: waits for a pause in typing, then queries one page."""
+        if self.search_job:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(self.SEARCH_DELAY_MS, self.apply_filters)
+
+    def apply_filters(self):
+        self.search_job = None
+        department = self.department_var.get()
+        self.pager.set_query(search=self.search_var.get().strip() or None,
+                             department=None if department == "All" else department,
+                             status=self.STATUS_FILTERS[self.status_var.get()])
+        self.request_page(self.pager.first_request())
+        self.request_count()
+
+    # --- Paging ---
+    def request_page(self, request):
+        self.loading = True
+        self.controller.tasks.submit("ReportFrame", self.pager.fetch, *request,
+                                     on_success=self.show_page, on_error=self.show_page_error)
+
+    def request_count(self):
+        query = self.pager.query
+        self.total = None
+        self.controller.tasks.submit(None, self.controller.db_manager.count_report_rows,
+                                     query['search'], query['department'], query['status'],
+                                     on_success=lambda total: self.show_count(query, total))
+
+    def on_tree_scroll(self, first, last):
+        """Treeview scroll callback: moves the scrollbar and pages in more rows near either end."""
+        self.scrollbar.set(first, last)
+        if self.loading or not self.pager.rows:
+            return
+        if float(last) > 0.9 and self.pager.has_after:
+            self.request_page(self.pager.next_request())
+        elif float(first) < 0.1 and self.pager.has_before:
+            self.request_page(self.pager.previous_request())
+
+    def show_page(self, result):
+        """Applies a fetched page to the Treeview. Runs on the UI thread."""
+        self.loading = False
+        mode, success = result[0], result[2]
+        changes = self.pager.apply(result)
+        if not success:
+            self.status_label.config(text="Refresh failed; showing last loaded data.")
+            return
+        if changes is None:
+            return  # fetched for a sort/filter that has since changed
+
+        added, dropped = changes
+        if mode == 'load':
+            self.populate_report(added)
+            self.tree.yview_moveto(0)
+        elif mode == 'reload':
+            top = self.tree.yview()[0]
+            self.refresh_report(added, dropped)
+            self.tree.yview_moveto(top)
+        else:
+            # Keep the rows the user is looking at in place while the window slides.
+            visible_top = self.tree.yview()[0] * len(self.tree.get_children())
+            self.tree.delete(*[record.faculty_id for record in dropped])
+            if mode == 'next':
+                for record in added:
+                    self.tree.insert('', tk.END, iid=record.faculty_id, values=self.format_record(record))
+                visible_top -= len(dropped)
+            else:
+                for index, record in enumerate(added):
+                    self.tree.insert('', index, iid=record.faculty_id, values=self.format_record(record))
+                visible_top += len(added)
+            self.tree.yview_moveto(max(visible_top, 0) / max(len(self.pager.rows), 1))
+        self.update_status()
+
+    def show_page_error(self, err):
+        self.loading = False
+        self.status_label.config(text=f"Report failed: {err}")
+
+    def show_count(self, query, total):
+        if query == self.pager.query:
+            self.total = total
+            self.update_status()
+
+    def update_status(self):
+        matching = f" of {self.total}" if self.total is not None else ""
+        self.status_label.config(text=f"Showing {len(self.pager.rows)}{matching} faculty - "
+                                      f"updated {datetime.now().strftime('%H:%M:%S')}")
+
+    def populate_report(self, records):
+        """Replaces the Treeview contents with `records`. Runs on the UI thread."""
+        self.tree.delete(*self.tree.get_children())
+        for record in records:
+            self.tree.insert('', tk.END, iid=record.faculty_id, values=self.format_record(record))
+
+    def refresh_report(self, records, previous):
+        """Brings the Treeview from `previous` to `records`, touching only rows that were
+        added, dropped or changed. Runs on the UI thread."""
+        shown = {record.faculty_id: self.format_record(record) for record in previous}
+        wanted = {record.faculty_id for record in records}
+        gone = [iid for iid in self.tree.get_children() if iid not in wanted]
+        if gone:
+            self.tree.delete(*gone)
+
+        for index, record in enumerate(records):
+            values = self.format_record(record)
+            iid = record.faculty_id
+            if not self.tree.exists(iid):
+                self.tree.insert('', index, iid=iid, values=values)
+            elif shown.get(iid) != values:
+                self.tree.item(iid, values=values)
+
+        # Rows whose sort value changed (e.g. status) move; the rest stay put.
+        children = list(self.tree.get_children())
+        for index, record in enumerate(records):
+            iid = record.faculty_id
+            if children[index] != iid:
+                children.remove(iid)
+                children.insert(index, iid)
+                self.tree.move(iid, '', index)
+
+    def export_history(self):
+        """Streams the full attendance history to CSV/JSON Lines in the background."""
+        path = filedialog.asksaveasfilename(title="Export Attendance History", defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+        if not path:
+            return
+
+        tasks = self.controller.tasks
+        self.export_btn.config(state=tk.DISABLED)
+        self.status_label.config(text="Exporting...")
+        progress = lambda done, total: tasks.post(self.show_export_progress, done, total)
+        tasks.submit(None, export_attendance, self.controller.db_manager, path, None, None, None, None, progress,
+                     on_success=lambda result: self.show_export_result(result, path))
+
+    def show_export_progress(self, done, total):
+        if total:
+            self.status_label.config(text=f"Exporting... {done}/{total} rows ({done / total * 100:.0f}%)")
+        else:
+            self.status_label.config(text=f"Exporting... {done} rows")
+
+    def show_export_result(self, result, path):
+        success, result = result
+        self.export_btn.config(state=tk.NORMAL)
+        if success:
+            self.status_label.config(text=f"Exported {result} rows")
+            messagebox.showinfo("Export Finished", f"Exported {result} rows to {path}.")
+        else:
+            self.status_label.config(text="Export failed")
+            messagebox.showerror("Error", f"Failed to export attendance. Error: {result}")
+
+    def format_record(self, record):
+        hours = f"{record.hours_rendered.total_seconds() / 3600:.2f} hrs" if record.hours_rendered else "N/A"
+        action_time_str = record.last_action_time.strftime('%H:%M:%S %m/%d') if record.last_action_time else "N/A"
+
+        return (
+            record.faculty_id,
+            record.full_name,
+            record.department or "N/A",
+            f"{record.last_action} @ {action_time_str}" if record.last_action else record.note,
+            hours,
+            record.note
+        )
+
+# --- FRAME 4: ANALYTICS & GRAPHS ---
+class AnalyticsFrame(tk.Frame):
+    """Analytics charts for a date range, optionally refreshed live for a wall display.
+
+    The axes and artists are created once; each refresh only changes bar
+    heights, line data and text, then asks for a draw_idle().
+    """
+
+    # Date ranges offered in the analytics screen, in days ending today.
+    RANGES = {"Today": 1, "Last 7 Days": 7, "Last 30 Days": 30, "Last 120 Days": 120}
+    # How often live mode checks for new punches.
+    LIVE_REFRESH_MS = 5000
+    # Long ranges run in worker processes (historical_analytics.py), in days ending today.
+    HISTORY_RANGES = {"Semester (180 Days)": 180, "Year (365 Days)": 365}
+    HISTORY_WORKERS = min(4, os.cpu_count() or 1)
+
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller 
+        
+        self.grid_rowconfigure(2, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        tk.Label(self, text="Attendance Analytics & Visualization", font=LARGE_FONT).grid(row=0, column=0, pady=15, sticky='ew')
+
+        controls = tk.Frame(self)
+        controls.grid(row=1, column=0, padx=10, sticky='ew')
+
+        self.history_var = tk.StringVar(value=next(iter(self.HISTORY_RANGES)))
+        history_menu = tk.OptionMenu(controls, self.history_var, *self.HISTORY_RANGES)
+        history_menu.config(font=SMALL_FONT)
+        history_menu.pack(side=tk.LEFT)
+        tk.Label(controls, text="Workers:", font=SMALL_FONT).pack(side=tk.LEFT, padx=(10, 0))
+        self.workers_var = tk.IntVar(value=self.HISTORY_WORKERS)
+        tk.Spinbox(controls, from_=1, to=os.cpu_count() or 1, textvariable=self.workers_var, width=3,
+                   font=SMALL_FONT).pack(side=tk.LEFT, padx=5)
+        self.history_btn = tk.Button(controls, text="RUN HISTORICAL", font=SMALL_FONT, command=self.run_history)
+        self.history_btn.pack(side=tk.LEFT, padx=5)
+
+        self.range_var = tk.StringVar(value="Today")
+        range_menu = tk.OptionMenu(controls, self.range_var, *self.RANGES, command=lambda _: self.generate_analytics())
+        range_menu.config(font=SMALL_FONT)
+        range_menu.pack(side=tk.RIGHT)
+
+        self.live_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(controls, text="Live", variable=self.live_var, font=SMALL_FONT,
+                       command=self.toggle_live).pack(side=tk.RIGHT, padx=10)
+        
+        self.chart_frame = tk.Frame(self)
+        self.chart_frame.grid(row=2, column=0, sticky='nsew', padx=10, pady=10)
+        
+        self.chart_frame.grid_rowconfigure(0, weight=1)
+        self.chart_frame.grid_columnconfigure(0, weight=1)
+        
+        self.text_output = tk.Text(self.chart_frame, height=10, state=tk.DISABLED, font=SMALL_FONT)
+        self.text_output.grid(row=1, column=0, sticky='ew', pady=(10, 0))
+
+        Figure, FigureCanvasTkAgg = load_plotting()
+        self.fig = Figure(figsize=(8, 5))
+        self.build_charts()
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.chart_frame)
+        self.canvas_widget = self.canvas.get_tk_widget()
+        
+        self.canvas_widget.grid(row=0, column=0, sticky='nsew') 
+
+        self.loaded = None  # (range_label, start, event count) of the data on screen
+        self.live_job = None
+
+    def build_charts(self):
+        """Creates the axes and every artist the refreshes update in place."""
+        import numpy as np
+        import analytics_engine
+        grid = self.fig.add_gridspec(2, 2, height_ratios=(3, 2))
+        self.ax = self.fig.add_subplot(grid[0, 0])
+        self.department_ax = self.fig.add_subplot(grid[0, 1])
+        self.trend_ax = self.fig.add_subplot(grid[1, :])
+
+        # 1. Average Time In and Time Out
+        self.time_bars = self.ax.bar(['Avg. Check In', 'Avg. Check Out'], [0, 0], color=['skyblue', 'salmon'])
+        self.time_labels = [self.ax.text(i, 0, "", ha='center', va='bottom', fontsize=9)
+                            for i in range(len(self.time_bars))]
+        self.ax.set_ylabel('Time (Seconds from Midnight)')
+
+        # 2. On-time rate per department; bars are created once the department names are known.
+        self.department_bars = None
+        self.department_names = None
+        self.department_ax.set_xlim(0, 100)
+        self.department_ax.set_title('On-Time Rate by Department (%)')
+
+        # 3. Punches per time-of-day bucket
+        minutes = analytics_engine.BUCKET_SECONDS // 60
+        hours = np.arange(analytics_engine.SECONDS_PER_DAY // analytics_engine.BUCKET_SECONDS) * minutes / 60
+        zeros = np.zeros(len(hours))
+        self.in_line, = self.trend_ax.plot(hours, zeros, drawstyle='steps-post', color='skyblue', label='Check-ins')
+        self.out_line, = self.trend_ax.plot(hours, zeros, drawstyle='steps-post', color='salmon', label='Check-outs')
+        self.trend_ax.set_xlim(0, 24)
+        self.trend_ax.set_xticks(range(0, 25, 2))
+        self.trend_ax.set_xlabel('Hour of Day')
+        self.trend_ax.set_ylabel(f'Punches per {minutes} min')
+        self.trend_ax.legend(loc='upper right', fontsize=8)
+
+        self.no_data_text = self.fig.text(0.5, 0.5, "", ha='center', va='center', fontsize=14, visible=False)
+        self.fig.tight_layout()
+
+    def calculate_stats(self, events):
+        """Calculates average times, rates, and on-time percentage (vectorized over AttendanceEvents)."""
+        import analytics_engine
+        summary = analytics_engine.summarize(events)
+        return (summary['avg_in_sec'], summary['avg_out_sec'], summary['in_rate'],
+                summary['out_rate'], summary['on_time_percentage'])
+        
+    def format_seconds_to_time(self, seconds):
+        """Converts total seconds back to HH:MM:SS format."""
+        if seconds is None: return "N/A"
+        h = int(seconds // 3600)
+        m = int((seconds % 3600) // 60)
+        s = int(seconds % 60)
+        return f"{h:02d}:{m:02d}:{s:02d}"
+
+    def generate_analytics(self):
+        """Reloads the selected range in the background; in live mode, keeps polling afterwards."""
+        self.update_text_output("Loading analytics...")
+        self.loaded = None
+        self.request_analytics()
+
+    def request_analytics(self):
+        self.controller.tasks.submit("AnalyticsFrame", self.load_analytics, self.range_var.get(), self.loaded,
+                                     on_success=self.show_analytics, on_error=self.show_analytics_error)
+
+    def toggle_live(self):
+        if self.live_var.get():
+            self.request_analytics()
+        else:
+            self.schedule_live()
+
+    def schedule_live(self):
+        """Polls again after LIVE_REFRESH_MS while live mode is on and this frame is on screen."""
+        if self.live_job:
+            self.after_cancel(self.live_job)
+            self.live_job = None
+        if self.live_var.get() and self.controller.current_frame == "AnalyticsFrame":
+            self.live_job = self.after(self.LIVE_REFRESH_MS, self.poll_live)
+
+    def poll_live(self):
+        self.live_job = None
+        if self.controller.current_frame == "AnalyticsFrame":
+            self.request_analytics()
+
+    def load_analytics(self, range_label, loaded=None):
+        """Runs on a worker thread.
+
+        Returns None when `loaded` (the data on screen) is still current, else
+        (loaded, range_label, events, stats, department_stats, trend, rollup_stats).
+        """
+        import analytics_engine
+        start, end = day_bounds(days=self.RANGES[range_label])
+        db_manager = self.controller.db_manager
+
+        # A COUNT on the Timestamp index is all a live poll costs until new punches land.
+        # It skips the result cache, which cannot see punches from other kiosks and gates,
+        # and so must the reads that follow a change it reports.
+        current = (range_label, start, db_manager.count_attendance(start, end, bypass_cache=True))
+        if current == loaded:
+            return None
+        fresh = loaded is not None
+
+        events = db_manager.get_attendance_events(start, end, bypass_cache=fresh)
+        if not len(events):
+            return current, range_label, events, None, None, None, None
+        # Worked hours come from the daily rollups: one row per faculty-day instead of every punch.
+        rollups = db_manager.get_daily_rollups(start.date(), end.date(), bypass_cache=fresh)
+        return (current, range_label, events, self.calculate_stats(events), analytics_engine.by_department(events),
+                analytics_engine.by_time_of_day(events), self.summarize_rollups(rollups))
+
+    def summarize_rollups(self, rollups):
+        """Average worked hours, on-time days and missed punches from DailyRollup rows.
+
+        Worked seconds are shift_engine totals: every session of the day, with
+        overnight shifts credited to the day they started.
+        """
+        # Days with only the Check-Out of an overnight shift carry no hours of their own.
+        work_days = [row for row in rollups if row.first_in is not None]
+        if not work_days:
+            return None
+        import numpy as np
+        worked = np.fromiter((row.worked_seconds for row in work_days), dtype=np.float64, count=len(work_days))
+        on_time = np.fromiter((bool(row.on_time) for row in work_days), dtype=bool, count=len(work_days))
+        return {
+            'faculty_days': len(work_days),
+            'avg_worked_hours': float(worked.mean()) / 3600,
+            'full_shift_days': float((worked >= 8 * 3600).mean()) * 100,
+            'on_time_days': float(on_time.mean()) * 100,
+            'orphan_punches': sum(row.orphan_punches for row in rollups),
+        }
+
+    def show_analytics(self, result):
+        """Plots/displays results. Runs on the UI thread."""
+        self.schedule_live()
+        if result is None:
+            return  # live poll found no new punches
+
+        self.loaded, range_label, events, stats, department_stats, trend, rollup_stats = result
+        
+        if not len(events):
+            self.update_text_output(f"No attendance data found for {range_label.lower()} to generate analytics.")
+            self.show_no_data(range_label)
+            return
+            
+        avg_in_sec, avg_out_sec, in_rate, out_rate, on_time_percentage = stats
+        self.update_charts(range_label, stats, department_stats, trend)
+        
+        # Text Output (Rates and Percentage)
+        in_time_formatted = self.format_seconds_to_time(avg_in_sec)
+        out_time_formatted = self.format_seconds_to_time(avg_out_sec)
+        
+        report_text = f"""
+        --- Attendance Analytics: {range_label} ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')}, {len(events)} events) ---
+        Average Check-In Time:    {in_time_formatted}
+        Average Check-Out Time:   {out_time_formatted}
+        
+        Rate of Time In Events:   {in_rate:.2f}% (Total check-ins vs. all events)
+        Rate of Time Out Events:  {out_rate:.2f}% (Total check-outs vs. all events)
+        
+        Percentage On-Time/Early: {on_time_percentage:.2f}% (Checked in at or before 8:00 AM)
+
+        """
+        if rollup_stats:
+            report_text += f"""
+        --- Daily Summaries ({rollup_stats['faculty_days']} faculty-days) ---
+        Average Hours Rendered:   {rollup_stats['avg_worked_hours']:.2f} hrs
+        Full 8-Hour Days:         {rollup_stats['full_shift_days']:.2f}%
+        On-Time Days:             {rollup_stats['on_time_days']:.2f}%
+        Missed Punches:           {rollup_stats['orphan_punches']} (check-ins/outs without a pair)
+        """
+        import numpy as np
+        report_text += "\n        --- By Department ---\n"
+        for name, ins, avg_in, on_time in zip(department_stats['departments'], department_stats['check_ins'],
+                                              department_stats['avg_in_sec'], department_stats['on_time_percentage']):
+            avg_in_formatted = self.format_seconds_to_time(None if np.isnan(avg_in) else avg_in)
+            report_text += f"        {name:<20} Check-ins: {ins:<6} Avg In: {avg_in_formatted}   On-Time: {on_time:.1f}%\n"
+        self.update_text_output(report_text)
+
+    def show_analytics_error(self, err):
+        self.update_text_output(f"Error loading analytics: {err}")
+        self.schedule_live()
+
+    def run_history(self):
+        """Semester/year analytics across worker processes; the UI stays responsive meanwhile."""
+        from historical_analytics import run_historical_analytics
+        try:
+            workers = max(1, self.workers_var.get())
+        except tk.TclError:
+            workers = self.HISTORY_WORKERS
+        label = self.history_var.get()
+        start, end = day_bounds(days=self.HISTORY_RANGES[label])
+
+        # The charts will show the historical result, so stop live polling over them.
+        self.live_var.set(False)
+        self.schedule_live()
+        self.history_btn.config(state=tk.DISABLED)
+        self.update_text_output(f"Running {label.lower()} analytics on {workers} worker(s)...")
+
+        tasks = self.controller.tasks
+        progress = lambda done, total: tasks.post(self.show_history_progress, label, done, total)
+        # submit() only forwards positional arguments to the task.
+        task = functools.partial(run_historical_analytics, progress=progress)
+        tasks.submit(None, task, self.controller.db_manager, start, end, workers,
+                     on_success=lambda result: self.show_history_result(label, result),
+                     on_error=lambda err: self.show_history_result(label, (False, err)))
+
+    def show_history_progress(self, label, done, total):
+        self.update_text_output(f"Running {label.lower()} analytics... {done}/{total} chunks ({done / total * 100:.0f}%)")
+
+    def show_history_result(self, label, result):
+        from historical_analytics import format_report
+        success, result = result
+        self.history_btn.config(state=tk.NORMAL)
+        if not success:
+            self.update_text_output(f"Historical analytics failed: {result}")
+            return
+        # Whatever the range menu says, it is no longer what the charts show.
+        self.loaded = None
+
+        summary = result['summary']
+        if not summary['events']:
+            self.update_text_output(f"No attendance data found for {label.lower()}.")
+            self.show_no_data(label)
+            return
+        stats = (summary['avg_in_sec'], summary['avg_out_sec'], summary['in_rate'],
+                 summary['out_rate'], summary['on_time_percentage'])
+        self.update_charts(label, stats, result['departments'], result['histogram'])
+        self.update_text_output(f"--- Historical Analytics: {label} ---\n{format_report(result)}")
+
+    def update_charts(self, range_label, stats, department_stats, trend):
+        """Moves the existing artists to the new values; nothing is cleared or re-created."""
+        avg_in_sec, avg_out_sec = stats[:2]
+        self.no_data_text.set_visible(False)
+
+        # 1. Average Time In and Time Out
+        for i, (bar, label, value) in enumerate(zip(self.time_bars, self.time_labels, (avg_in_sec, avg_out_sec))):
+            bar.set_height(value or 0)
+            label.set_position((i, (value or 0) + 500))
+            label.set_text(self.format_seconds_to_time(value) if value is not None else "")
+        self.ax.set_ylim(0, max(avg_in_sec or 0, avg_out_sec or 0) * 1.15 or 1)
+        self.ax.set_title(f'Average Time In/Out ({range_label})')
+
+        # 2. On-time rate per department
+        names = tuple(department_stats['departments'])
+        rates = department_stats['on_time_percentage']
+        if names != self.department_names:
+            # Only a new or vanished department rebuilds the bars.
+            if self.department_bars is not None:
+                self.department_bars.remove()
+            positions = range(len(names))
+            self.department_bars = self.department_ax.barh(positions, rates, color='mediumseagreen')
+            self.department_ax.set_yticks(positions)
+            self.department_ax.set_yticklabels(names, fontsize=8)
+            self.department_ax.set_ylim(len(names) - 0.5, -0.5)
+            self.department_names = names
+            self.fig.tight_layout()  # make room for the new labels
+        else:
+            for bar, rate in zip(self.department_bars, rates):
+                bar.set_width(rate)
+
+        # 3. Punches per time-of-day bucket
+        self.in_line.set_ydata(trend['check_ins'])
+        self.out_line.set_ydata(trend['check_outs'])
+        peak = max(trend['check_ins'].max(), trend['check_outs'].max())
+        self.trend_ax.set_ylim(0, peak * 1.1 + 1)
+
+        self.canvas.draw_idle()
+
+    def show_no_data(self, range_label):
+        for bar, label in zip(self.time_bars, self.time_labels):
+            bar.set_height(0)
+            label.set_text("")
+        if self.department_bars is not None:
+            for bar in self.department_bars:
+                bar.set_width(0)
+        self.in_line.set_ydata(self.in_line.get_ydata() * 0)
+        self.out_line.set_ydata(self.out_line.get_ydata() * 0)
+        self.no_data_text.set_text(f"No Data ({range_label})")
+        self.no_data_text.set_visible(True)
+        self.canvas.draw_idle()
+        
+    def update_text_output(self, text):
+        """Helper function to update the read-only text box."""
+        self.text_output.config(state=tk.NORMAL)
+        self.text_output.delete('1.0', tk.END)
+        self.text_output.insert(tk.END, text)
+        self.text_output.config(state=tk.DISABLED)
+
+
+# --- FRAME 5: DIAGNOSTICS ---
+class DiagnosticsFrame(tk.Frame):
+    """Live per-method database latency stats, pool usage, roster cache, punch index, result cache and journal state."""
+
+    REFRESH_MS = 2000
+    COLUMNS = ('Method', 'Calls', 'Errors', 'Rows', 'p50', 'p95', 'p99', 'Max', 'Connect p95', 'Execute p95', 'Fetch p95')
+
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        tk.Label(self, text="Database Diagnostics", font=LARGE_FONT).grid(row=0, column=0, pady=20, sticky='ew')
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show='headings')
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=170 if column == 'Method' else 70, anchor='w' if column == 'Method' else 'e')
+        self.tree.grid(row=1, column=0, sticky='nsew', padx=10, pady=10)
+
+        self.summary_label = tk.Label(self, text="", font=SMALL_FONT, justify='left', anchor='w')
+        self.summary_label.grid(row=2, column=0, sticky='ew', padx=10)
+
+        tk.Button(self, text="RESET STATS", font=SMALL_FONT,
+                  command=self.reset_stats).grid(row=3, column=0, sticky='e', padx=10, pady=10)
+
+        self.refresh_job = None
+
+    def refresh_stats(self):
+        """Redraws the stats and keeps doing so while this frame is on screen."""
+        if self.refresh_job:
+            self.after_cancel(self.refresh_job)
+            self.refresh_job = None
+        if self.controller.current_frame != "DiagnosticsFrame":
+            return
+
+        fmt = lambda ms: f"{ms:.1f}" if ms is not None else "-"
+        snapshot = self.controller.db_manager.instrumentation.snapshot()
+        self.tree.delete(*self.tree.get_children())
+        # Methods costing the most cumulative time first.
+        for method, stats in sorted(snapshot.items(), key=lambda item: -item[1]['total']['total_ms']):
+            total = stats['total']
+            self.tree.insert('', tk.END, values=(
+                method, stats['calls'], stats['errors'], stats['rows'],
+                fmt(total['p50_ms']), fmt(total['p95_ms']), fmt(total['p99_ms']), fmt(total['max_ms']),
+                fmt(stats['connect']['p95_ms']), fmt(stats['execute']['p95_ms']), fmt(stats['fetch']['p95_ms']),
+            ))
+
+        pool = self.controller.db_manager.pool.stats()
+        roster = self.controller.roster.stats()
+        journal = self.controller.journal
+        rollups = self.controller.rollups
+        index = self.controller.punch_index.stats()
+        cache = self.controller.db_manager.cache.stats()
+        self.summary_label.config(text=(
+            f"Pool: {pool['in_use']}/{pool['size']} in use, {pool['idle']} idle, "
+            f"{pool['opened']} opened, {pool['discarded']} discarded   (times in ms)\n"
+            f"Roster cache: {roster['size']} entries, hit rate {roster['hit_rate'] * 100:.1f}%, "
+            f"{roster['misses']} misses\n"
+            f"Punch index: {index['size']} faculty, synced {index['synced_until'] or 'never'}"
+            f"{'   Last sync error: ' + str(index['last_error']) if index['last_error'] else ''}\n"
+            f"Result cache: {cache['size']} entries, hit rate {cache['hit_rate'] * 100:.1f}%, "
+            f"data version {cache['version']}\n"
+            f"Punch journal: {journal.pending_count()} pending"
+            f"{'   Last flush error: ' + str(journal.last_error) if journal.last_error else ''}\n"
+            f"Daily summaries: {rollups.pending_count()} faculty-days awaiting refresh"
+            f"{'   Last error: ' + str(rollups.last_error) if rollups.last_error else ''}"
+        ))
+        self.refresh_job = self.after(self.REFRESH_MS, self.refresh_stats)
+
+    def reset_stats(self):
+        self.controller.db_manager.instrumentation.reset()
+        self.tree.delete(*self.tree.get_children())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Faculty Attendance System")
+    parser.add_argument('--sqlite', metavar='PATH', help="Use a local SQLite database instead of the MSSQL server.")
+    parser.add_argument('--serve', metavar='PORT', type=int,
+                        help="Also accept gate punches over HTTP on this port (see checkin_server.py).")
+    parser.add_argument('--cache-staleness', metavar='SECONDS', type=float,
+                        help="Reuse report/analytics results for at most this long "
+                             f"(default {AttendanceApp.CACHE_MAX_STALENESS:g}; 0 disables the cache).")
+    parser.add_argument('--no-prewarm', action='store_true',
+                        help="Don't build the other screens and load matplotlib in the background after startup.")
+    parser.add_argument('--measure-startup', action='store_true',
+                        help="Print startup timings as JSON once the window is up, then exit.")
+    args = parser.parse_args()
+
+    db_manager = None
+    if args.sqlite:
+        db_manager = DatabaseManager(backend=SQLiteBackend(args.sqlite), use_rollups=True,
+                                     slow_log_path='slow_queries.log',
+                                     cache_max_staleness=AttendanceApp.CACHE_MAX_STALENESS)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    app = AttendanceApp(db_manager, prewarm=not args.no_prewarm)
+    if args.cache_staleness is not None:
+        app.db_manager.cache.max_staleness = args.cache_staleness
+    if args.measure_startup:
+        app.after_idle(app.report_startup)
+    server = None
+    if args.serve:
+        from checkin_server import CheckInServer  # asyncio is only needed when serving
+        server = CheckInServer(app.checkin_service, port=args.serve)
+        server.start_in_thread()
+    app.mainloop()
+    if server:
+        server.stop()
+    app.tasks.shutdown()
+    app.punch_index.stop()
+    app.journal.stop()
+    app.rollups.close()
+    app.db_manager.close()
\ No newline at end of file
@@ -0,0 +1,94 @@
+# attendance_export.py
+
+import argparse
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+from db_manager import DatabaseManager, DEFAULT_SERVER, DEFAULT_DATABASE
+
+COLUMNS = ('FacultyID', 'FullName', 'Department', 'Timestamp', 'Action')
+
+def _write_csv(f, chunks):
+    writer = csv.writer(f)
+    writer.writerow(COLUMNS)
+    for chunk in chunks:
+        writer.writerows((fid, name, dept, ts.isoformat(sep=' '), action)
+                         for fid, name, dept, ts, action in chunk)
+        yield len(chunk)
+
+def _write_jsonl(f, chunks):
+    for chunk in chunks:
+        f.writelines(json.dumps(dict(zip(COLUMNS, (fid, name, dept, ts.isoformat(), action)))) + "\n"
+                     for fid, name, dept, ts, action in chunk)
+        yield len(chunk)
+
+WRITERS = {'csv': _write_csv, 'jsonl': _write_jsonl}
+
+def format_for_path(path):
+    """'jsonl' for .jsonl/.json files, otherwise 'csv'."""
+    return 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.json') else 'csv'
+
+def export_attendance(db_manager, path, fmt=None, start=None, end=None, department=None,
+                      progress=None, chunk_size=5000):
+    """Streams attendance rows to a CSV or JSON Lines file with constant memory.
+
+    progress: optional callback(rows_written, total_rows or None), called after each chunk.
+    Returns (True, rows_written) or (False, error message). A failed export leaves no partial file.
+    """
+    fmt = fmt or format_for_path(path)
+    if fmt not in WRITERS:
+        return False, f"Unknown export format '{fmt}'."
+
+    total = db_manager.count_attendance(start, end, department) if progress else None
+    tmp_path = path + ".part"
+    written = 0
+    try:
+        chunks = db_manager.iter_attendance(start, end, department, chunk_size=chunk_size)
+        try:
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                for count in WRITERS[fmt](f, chunks):
+                    written += count
+                    if progress:
+                        progress(written, total)
+        finally:
+            # Hands the pooled connection back even if writing the file failed.
+            chunks.close()
+        os.replace(tmp_path, path)
+        return True, written
+    except db_manager.errors + (OSError,) as err:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False, str(err)
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d')
+
+def main():
+    parser = argparse.ArgumentParser(description="Export attendance history to CSV or JSON Lines.")
+    parser.add_argument('path', help="Output file (.csv, or .jsonl for JSON Lines).")
+    parser.add_argument('--format', choices=sorted(WRITERS))
+    parser.add_argument('--start', type=_parse_date, help="First day to include (YYYY-MM-DD).")
+    parser.add_argument('--end', type=_parse_date, help="Last day to include (YYYY-MM-DD).")
+    parser.add_argument('--department')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--server', default=DEFAULT_SERVER)
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    args = parser.parse_args()
+
+    # --end is inclusive on the command line; the query range is half-open.
+    end = args.end + timedelta(days=1) if args.end else None
+
+    def show_progress(done, total):
+        print(f"  {done}/{total if total is not None else '?'} rows written")
+
+    db_manager = DatabaseManager(server=args.server, database=args.database, pool_size=1)
+    try:
+        success, result = export_attendance(db_manager, args.path, args.format, args.start, end,
+                                            args.department, show_progress, args.chunk_size)
+        print(f"Exported {result} rows to {args.path}" if success else f"Error: {result}")
+    finally:
+        db_manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# backends.py
+
+import re
+import sqlite3
+from datetime import date, datetime
+
+class MSSQLBackend:
+    """Remote Microsoft SQL Server through pyodbc (the production backend)."""
+
+    name = 'mssql'
+
+    def __init__(self, server, database, user='aspnetfp_', password='aspnetfinals',
+                 driver='{ODBC Driver 17 for SQL Server}'):
+        # pyodbc is only needed when this backend is actually used.
+        import pyodbc
+        self._pyodbc = pyodbc
+        self.Error = pyodbc.Error
+
+        self.server = server
+        self.database = database
+        self.driver = driver
+        self.user = user
+        self.password = password
+
+        self.conn_str = (
+            f'DRIVER={self.driver};'
+            f'SERVER={self.server};'
+            f'DATABASE={self.database};'
+            f'UID={self.user};'
+            f'PWD={self.password}'
+        )
+
+    def connect(self):
+        return self._pyodbc.connect(self.conn_str)
+
+    def close(self):
+        pass
+
+    def prepare_bulk(self, cursor):
+        """Sends executemany parameters as one array instead of a round trip per row."""
+        cursor.fast_executemany = True
+
+    def epoch_seconds(self, column):
+        return f"DATEDIFF_BIG(SECOND, '19700101', {column})"
+
+    def limit_sql(self):
+        """Row limit appended after ORDER BY; takes the row count as one parameter."""
+        return "OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
+
+    def insert_missing_attendance_sql(self, row_count):
+        """Multi-row insert that skips rows already present (same FacultyID, Action, Timestamp)."""
+        values = ", ".join(["(?, ?, ?)"] * row_count)
+        return f"""
+        INSERT INTO dbo.Attendance (FacultyID, Action, Timestamp)
+        SELECT V.FacultyID, V.Action, V.Timestamp
+        FROM (VALUES {values}) AS V(FacultyID, Action, Timestamp)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM dbo.Attendance AS A
+            WHERE A.FacultyID = V.FacultyID AND A.Action = V.Action AND A.Timestamp = V.Timestamp
+        );
+        """
+
+    def upsert_rollup_sql(self):
+        return """
+        MERGE dbo.AttendanceDaily AS T
+        USING (SELECT ? AS FacultyID, ? AS WorkDate, ? AS FirstIn, ? AS LastIn, ? AS LastOut,
+                      ? AS LastAction, ? AS LastActionTime, ? AS CheckIns, ? AS CheckOuts,
+                      ? AS WorkedSeconds, ? AS OnTime, ? AS OrphanPunches) AS S
+        ON T.FacultyID = S.FacultyID AND T.WorkDate = S.WorkDate
+        WHEN MATCHED THEN UPDATE SET
+            FirstIn = S.FirstIn, LastIn = S.LastIn, LastOut = S.LastOut, LastAction = S.LastAction,
+            LastActionTime = S.LastActionTime, CheckIns = S.CheckIns, CheckOuts = S.CheckOuts,
+            WorkedSeconds = S.WorkedSeconds, OnTime = S.OnTime, OrphanPunches = S.OrphanPunches,
+            UpdatedAt = GETDATE()
+        WHEN NOT MATCHED THEN INSERT
+            (FacultyID, WorkDate, FirstIn, LastIn, LastOut, LastAction, LastActionTime,
+             CheckIns, CheckOuts, WorkedSeconds, OnTime, OrphanPunches)
+        VALUES (S.FacultyID, S.WorkDate, S.FirstIn, S.LastIn, S.LastOut, S.LastAction, S.LastActionTime,
+                S.CheckIns, S.CheckOuts, S.WorkedSeconds, S.OnTime, S.OrphanPunches);
+        """
+
+_DATETIME_RE = re.compile(r'^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d+)?$')
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+def _convert_row(cursor, row):
+    """SQLite has no datetime type, so turn ISO strings back into datetime/date,
+    including for computed columns (MAX, window functions) that lose their declared type."""
+    return tuple(
+        (datetime.fromisoformat(v) if _DATETIME_RE.match(v) else
+         date.fromisoformat(v) if _DATE_RE.match(v) else v) if isinstance(v, str) else v
+        for v in row
+    )
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+
+class SQLiteBackend:
+    """Local SQLite stand-in with the same dbo.* tables, for benchmarks and offline development.
+
+    The database file is attached under the schema name `dbo`, so the
+    application's `dbo.Faculty` / `dbo.Attendance` SQL runs unchanged.
+    Pass path=':memory:' for a throwaway database shared by all pooled connections.
+    """
+
+    name = 'sqlite'
+    Error = sqlite3.Error
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS dbo.Faculty (
+            FacultyID TEXT PRIMARY KEY,
+            FullName TEXT NOT NULL,
+            Department TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS dbo.Attendance (
+            AttendanceID INTEGER PRIMARY KEY AUTOINCREMENT,
+            FacultyID TEXT NOT NULL,
+            Timestamp TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+            Action TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS dbo.AttendanceDaily (
+            FacultyID TEXT NOT NULL,
+            WorkDate DATE NOT NULL,
+            FirstIn TIMESTAMP, LastIn TIMESTAMP, LastOut TIMESTAMP,
+            LastAction TEXT, LastActionTime TIMESTAMP,
+            CheckIns INTEGER NOT NULL DEFAULT 0,
+            CheckOuts INTEGER NOT NULL DEFAULT 0,
+            WorkedSeconds INTEGER NOT NULL DEFAULT 0,
+            OnTime INTEGER NOT NULL DEFAULT 0,
+            UpdatedAt TIMESTAMP,
+            OrphanPunches INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (FacultyID, WorkDate)
+        )""",
+        # Same indexes schema_manager creates on MSSQL.
+        "CREATE INDEX IF NOT EXISTS dbo.IX_Attendance_FacultyID_Timestamp ON Attendance (FacultyID, Timestamp)",
+        "CREATE INDEX IF NOT EXISTS dbo.IX_Attendance_Timestamp ON Attendance (Timestamp)",
+        "CREATE INDEX IF NOT EXISTS dbo.IX_Faculty_FullName ON Faculty (FullName)",
+        "CREATE INDEX IF NOT EXISTS dbo.IX_Faculty_Department ON Faculty (Department)",
+        "CREATE INDEX IF NOT EXISTS dbo.IX_AttendanceDaily_WorkDate ON AttendanceDaily (WorkDate)",
+    ]
+
+    def __init__(self, path):
+        if path == ':memory:':
+            # A named shared-cache memory database lives as long as any connection to it.
+            path = f"file:attendance_{id(self)}?mode=memory&cache=shared"
+        self.path = path
+
+        # Kept open so the schema is created once and a memory database is not dropped
+        # while the pool has no idle connections.
+        self._keepalive = self.connect()
+        for statement in self.SCHEMA:
+            self._keepalive.execute(statement)
+        self._keepalive.commit()
+
+    def connect(self):
+        conn = sqlite3.connect('file::memory:', uri=True, check_same_thread=False, timeout=30)
+        conn.execute("ATTACH DATABASE ? AS dbo", (self.path,))
+        conn.row_factory = _convert_row
+        return conn
+
+    def close(self):
+        self._keepalive.close()
+
+    def prepare_bulk(self, cursor):
+        pass
+
+    def epoch_seconds(self, column):
+        return f"CAST(strftime('%s', {column}) AS INTEGER)"
+
+    def limit_sql(self):
+        return "LIMIT ?"
+
+    def insert_missing_attendance_sql(self, row_count):
+        values = ", ".join(["(?, ?, ?)"] * row_count)
+        # Statement must start with INSERT for sqlite3 to report rowcount.
+        return f"""
+        INSERT INTO dbo.Attendance (FacultyID, Action, Timestamp)
+        SELECT V.column1, V.column2, V.column3
+        FROM (VALUES {values}) AS V
+        WHERE NOT EXISTS (
+            SELECT 1 FROM dbo.Attendance AS A
+            WHERE A.FacultyID = V.column1 AND A.Action = V.column2 AND A.Timestamp = V.column3
+        );
+        """
+
+    def upsert_rollup_sql(self):
+        return """
+        INSERT INTO dbo.AttendanceDaily
+            (FacultyID, WorkDate, FirstIn, LastIn, LastOut, LastAction, LastActionTime,
+             CheckIns, CheckOuts, WorkedSeconds, OnTime, OrphanPunches, UpdatedAt)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (FacultyID, WorkDate) DO UPDATE SET
+            FirstIn = excluded.FirstIn, LastIn = excluded.LastIn, LastOut = excluded.LastOut,
+            LastAction = excluded.LastAction, LastActionTime = excluded.LastActionTime,
+            CheckIns = excluded.CheckIns, CheckOuts = excluded.CheckOuts,
+            WorkedSeconds = excluded.WorkedSeconds, OnTime = excluded.OnTime,
+            OrphanPunches = excluded.OrphanPunches, UpdatedAt = excluded.UpdatedAt;
+        """
@@ -0,0 +1,80 @@
+# bench_data.py
+
+import random
+from datetime import datetime, timedelta, time
+
+DEPARTMENTS = ['Computer Science', 'Mathematics', 'Physics', 'Chemistry', 'Biology',
+               'English', 'History', 'Business', 'Engineering', 'Nursing']
+
+def generate_faculty(count, seed=0):
+    """Yields (FacultyID, FullName, Department) for `count` synthetic faculty members."""
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        yield f"F{i:06d}", f"Faculty Member {i:06d}", rng.choice(DEPARTMENTS)
+
+def _at(day, mean_hours, sd_minutes, rng, earliest=5.0, latest=23.5):
+    hours = min(max(rng.gauss(mean_hours, sd_minutes / 60), earliest), latest)
+    stamp = datetime.combine(day, time()) + timedelta(hours=hours)
+    # Same 10 ms resolution PunchJournal stores.
+    return stamp.replace(microsecond=stamp.microsecond // 10000 * 10000)
+
+def generate_punches(faculty_ids, start_date, days, seed=0, attendance_rate=0.92, split_shift_rate=0.25,
+                     missed_check_out_rate=0.03, double_tap_rate=0.02):
+    """Yields (FacultyID, Action, Timestamp) punches with a realistic shape.
+
+    Weekdays only; arrivals around 7:50 (so roughly 60% are on time), about
+    8.5 hour days, some split shifts with a lunch break, some forgotten
+    check-outs and some accidental double taps.
+    """
+    rng = random.Random(seed)
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        if day.weekday() >= 5:
+            continue
+        for fid in faculty_ids:
+            if rng.random() > attendance_rate:
+                continue
+
+            arrival = _at(day, 7.83, 20, rng)
+            yield fid, 'Check-In', arrival
+            if rng.random() < double_tap_rate:
+                yield fid, 'Check-In', arrival + timedelta(seconds=rng.randint(1, 5))
+
+            if rng.random() < split_shift_rate:
+                lunch_out = _at(day, 12.0, 15, rng)
+                if lunch_out > arrival:
+                    yield fid, 'Check-Out', lunch_out
+                    yield fid, 'Check-In', lunch_out + timedelta(minutes=rng.randint(30, 75))
+
+            if rng.random() >= missed_check_out_rate:
+                departure = arrival + timedelta(hours=rng.gauss(8.5, 0.75))
+                yield fid, 'Check-Out', departure.replace(microsecond=departure.microsecond // 10000 * 10000)
+
+def populate(db_manager, faculty_count, days, start_date=None, seed=0, chunk_size=20000):
+    """Fills an (empty) database with synthetic faculty and punches.
+
+    Returns (faculty_count, punch_count). Punches are written with plain
+    executemany because the generated data has no duplicates to skip.
+    """
+    start_date = start_date or (datetime.now().date() - timedelta(days=days - 1))
+
+    faculty = list(generate_faculty(faculty_count, seed))
+    rows = ((n, fid, name, dept) for n, (fid, name, dept) in enumerate(faculty, start=1))
+    for _, fid, success, message in db_manager.bulk_add_faculty(rows):
+        if not success:
+            raise RuntimeError(f"Could not add {fid}: {message}")
+
+    punch_count = 0
+    sql = "INSERT INTO dbo.Attendance (FacultyID, Action, Timestamp) VALUES (?, ?, ?)"
+    punches = generate_punches([f[0] for f in faculty], start_date, days, seed)
+    with db_manager.connection() as conn:
+        cursor = conn.cursor()
+        db_manager.backend.prepare_bulk(cursor)
+        while True:
+            chunk = [p for _, p in zip(range(chunk_size), punches)]
+            if not chunk:
+                break
+            cursor.executemany(sql, chunk)
+            punch_count += len(chunk)
+        conn.commit()
+    return faculty_count, punch_count
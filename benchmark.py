@@ -0,0 +1,293 @@
+# benchmark.py
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from datetime import datetime, timedelta
+
+import analytics_engine
+from backends import SQLiteBackend
+from bench_data import populate
+from db_manager import DatabaseManager, day_bounds
+from punch_journal import PunchJournal
+from roster_cache import RosterCache
+
+DEFAULT_SCALES = (100, 10000, 100000)
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+def time_call(fn, repeat=3):
+    """Runs fn `repeat` times; returns min/median/max wall time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {'min_ms': _ms(min(samples)), 'median_ms': _ms(statistics.median(samples)),
+            'max_ms': _ms(max(samples)), 'runs': repeat}
+
+def latency_summary(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+    return {'p50_ms': _ms(pick(0.50)), 'p95_ms': _ms(pick(0.95)), 'p99_ms': _ms(pick(0.99)),
+            'max_ms': _ms(ordered[-1]), 'samples': len(ordered)}
+
+def bench_check_in(db_manager, workdir, faculty_count, punches, seed=0):
+    """Kiosk punch path (roster lookup + journal write) and the flush that follows,
+    compared with the old one-round-trip-per-punch insert."""
+    rng = random.Random(seed)
+    roster = RosterCache(db_manager)
+    warm_up = time_call(roster.warm_up, repeat=1)
+
+    journal = PunchJournal(db_manager, path=os.path.join(workdir, f"journal_{faculty_count}.sqlite3"))
+    samples = []
+    for _ in range(punches):
+        fid = f"F{rng.randint(1, faculty_count):06d}"
+        start = time.perf_counter()
+        if roster.get(fid):
+            journal.record(fid, 'Check-In')
+        samples.append(time.perf_counter() - start)
+    flush = time_call(journal.flush, repeat=1)
+    journal.stop(flush=False)
+
+    direct = []
+    for _ in range(punches):
+        fid = f"F{rng.randint(1, faculty_count):06d}"
+        start = time.perf_counter()
+        db_manager.execute_non_query("INSERT INTO dbo.Attendance (FacultyID, Action) VALUES (?, ?)",
+                                     (fid, 'Check-Out'))
+        direct.append(time.perf_counter() - start)
+
+    return {
+        'roster_warm_up': warm_up,
+        'check_in': latency_summary(samples),
+        'journal_flush': dict(flush, punches=punches),
+        'direct_insert': latency_summary(direct),
+    }
+
+class _DictFaculty:
+    """Faculty as it was before __slots__, for the memory comparison."""
+
+    def __init__(self, faculty_id, full_name, department):
+        self.faculty_id = faculty_id
+        self.full_name = full_name
+        self.department = department
+
+def _legacy_report_row(record):
+    return {'FacultyID': record.faculty_id, 'FullName': record.full_name,
+            'LastActionTime': record.last_action_time, 'LastAction': record.last_action,
+            'PreviousCheckInTime': None, 'HoursRendered': record.hours_rendered,
+            'Note': record.note}
+
+def _legacy_time_data(rows):
+    """The nested dict get_raw_time_data used to return."""
+    organized = {}
+    for fid, timestamp, action in rows:
+        entry = organized.setdefault(fid, {'check_ins': [], 'check_outs': []})
+        entry['check_ins' if action == 'Check-In' else 'check_outs'].append(timestamp)
+    return organized
+
+def _raw_rows(db_manager, sql, params=()):
+    with db_manager.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+def _retained_bytes(build):
+    """Bytes still allocated once build() returns, i.e. the size of what it built."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+def bench_memory(db_manager, today):
+    """Memory held by the roster, the report and one day's punches in the current
+    record types vs the former __dict__ objects, dicts and lists of datetimes.
+
+    Legacy report dicts are built from the new records and share their strings,
+    so that comparison understates the saving.
+    """
+    day_sql = ("SELECT FacultyID, Timestamp, Action FROM dbo.Attendance "
+               "WHERE Timestamp >= ? AND Timestamp < ? ORDER BY Timestamp")
+    cases = {
+        'roster': (db_manager.load_all_faculty,
+                   lambda: [_DictFaculty(*row) for row in
+                            _raw_rows(db_manager, "SELECT FacultyID, FullName, Department FROM dbo.Faculty")]),
+        'report': (db_manager.get_attendance_report,
+                   lambda: [_legacy_report_row(r) for r in db_manager.get_attendance_report()]),
+        'raw_time_data': (lambda: db_manager.get_raw_time_data(today),
+                          lambda: _legacy_time_data(_raw_rows(db_manager, day_sql, day_bounds(today)))),
+    }
+    results = {}
+    for name, (load, legacy) in cases.items():
+        count = len(load())  # warm-up, so one-off allocations (pool, stats) aren't counted
+        compact = _retained_bytes(load)
+        before = _retained_bytes(legacy)
+        results[name] = {'records': count, 'legacy_bytes': before, 'compact_bytes': compact,
+                         'reduction_pct': round((1 - compact / before) * 100, 1) if before else None}
+    return results
+
+def bench_report_render(db_manager, report_data, repeat):
+    """Time to fill ReportFrame's Treeview; needs a display."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as err:
+        return {'skipped': str(err)}
+
+    from attendance_app import ReportFrame
+    try:
+        frame = ReportFrame(root, types.SimpleNamespace(db_manager=db_manager, tasks=None))
+
+        def render():
+            frame.populate_report(report_data)
+            root.update_idletasks()
+
+        return time_call(render, repeat)
+    finally:
+        root.destroy()
+
+def bench_startup(workdir, repeat, prewarm=False):
+    """Cold start of attendance_app.py until the attendance screen is drawn (--measure-startup)."""
+    app = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'attendance_app.py')
+    command = [sys.executable, app, '--sqlite', os.path.join(workdir, 'startup.sqlite3'), '--measure-startup']
+    if not prewarm:
+        command.append('--no-prewarm')
+
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(command, capture_output=True, text=True, cwd=workdir)
+        wall = time.perf_counter() - start
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return {'skipped': lines[-1] if lines else f"exit code {proc.returncode}"}
+        run = json.loads(proc.stdout.strip().splitlines()[-1])
+        run['process_ms'] = _ms(wall)
+        runs.append(run)
+
+    pick = lambda key: statistics.median(run[key] for run in runs)
+    return {'imports_ms': pick('imports_ms'), 'init_ms': pick('init_ms'),
+            'interactive_ms': pick('interactive_ms'), 'process_ms': pick('process_ms'),
+            'matplotlib_loaded': runs[0]['matplotlib_loaded'], 'runs': repeat}
+
+def bench_result_cache(path, today, repeat):
+    """Report + analytics screen queries on a first visit and on repeat visits with the result cache on."""
+    db_manager = DatabaseManager(backend=SQLiteBackend(path), cache_max_staleness=None)
+    start, end = day_bounds(today)
+
+    def visit():
+        db_manager.get_report_page(limit=100)
+        db_manager.count_report_rows()
+        db_manager.get_departments()
+        db_manager.count_attendance(start, end)
+        db_manager.get_attendance_events(start, end)
+        db_manager.get_daily_rollups(start.date(), end.date())
+
+    try:
+        first = time_call(visit, repeat=1)
+        return {'first_visit': first, 'repeat_visit': time_call(visit, repeat), 'cache': db_manager.cache.stats()}
+    finally:
+        db_manager.close()
+
+def bench_scale(faculty_count, days, workdir, punches, repeat, render):
+    path = os.path.join(workdir, f"bench_{faculty_count}.sqlite3")
+    db_manager = DatabaseManager(backend=SQLiteBackend(path))
+    try:
+        start = time.perf_counter()
+        _, punch_count = populate(db_manager, faculty_count, days)
+        results = {'faculty': faculty_count, 'days': days, 'attendance_rows': punch_count,
+                   'setup_s': round(time.perf_counter() - start, 2)}
+
+        # Synthetic data skips weekends, so "today" means the latest weekday.
+        today = datetime.now().date()
+        while today.weekday() >= 5:
+            today -= timedelta(days=1)
+        results.update(bench_check_in(db_manager, workdir, faculty_count, punches))
+
+        results['get_attendance_report'] = time_call(db_manager.get_attendance_report, repeat)
+        results['report_first_page'] = time_call(lambda: db_manager.get_report_page(limit=100), repeat)
+        results['report_first_page_by_status'] = time_call(
+            lambda: db_manager.get_report_page('status', limit=100), repeat)
+        results['report_search'] = time_call(lambda: db_manager.get_report_page(limit=100, search='0042'), repeat)
+        # What the report screen holds at most: ReportPager's default three pages of 100.
+        _, report_data = db_manager.get_report_page(limit=300)
+        results['get_raw_time_data'] = time_call(lambda: db_manager.get_raw_time_data(today), repeat)
+        results['analytics_today'] = time_call(
+            lambda: analytics_engine.summarize(db_manager.get_attendance_events(*day_bounds(today))), repeat)
+        results['analytics_full_range'] = time_call(
+            lambda: analytics_engine.by_department(db_manager.get_attendance_events(*day_bounds(today, days))),
+            repeat)
+        results['result_cache'] = bench_result_cache(path, today, repeat)
+        results['memory'] = bench_memory(db_manager, today)
+        results['report_render'] = bench_report_render(db_manager, report_data, repeat) if render else {'skipped': 'disabled'}
+        return results
+    finally:
+        db_manager.close()
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the attendance system against a synthetic SQLite database.")
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES), help="Faculty counts to test.")
+    parser.add_argument('--days', type=int, default=5, help="Days of synthetic history per scale.")
+    parser.add_argument('--punches', type=int, default=200, help="Check-ins to time per scale.")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-render', action='store_true', help="Skip the Tk benchmarks (report rendering, GUI startup).")
+    parser.add_argument('--workdir', help="Keep the generated databases here instead of a temp directory.")
+    parser.add_argument('--output', help="Write JSON results to this file (default: stdout).")
+    args = parser.parse_args()
+
+    output = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'python': sys.version.split()[0],
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+        },
+        'results': [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        if not args.no_render:
+            print("Measuring GUI startup...", file=sys.stderr)
+            output['startup'] = bench_startup(workdir, args.repeat)
+        for scale in args.scales:
+            print(f"Benchmarking {scale} faculty...", file=sys.stderr)
+            output['results'].append(bench_scale(scale, args.days, workdir, args.punches, args.repeat,
+                                                 not args.no_render))
+
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
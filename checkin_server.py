@@ -0,0 +1,201 @@
+# checkin_server.py
+
+import argparse
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime
+from http import HTTPStatus
+
+from backends import SQLiteBackend
+from checkin_service import CheckInService
+from db_manager import DatabaseManager, DEFAULT_SERVER, DEFAULT_DATABASE
+from punch_index import PunchIndex
+from punch_journal import PunchJournal
+from rollup import RollupManager
+from roster_cache import RosterCache
+
+log = logging.getLogger(__name__)
+
+# A duplicate is reported as success: the reader bounced, and the punch is already stored.
+STATUS_CODES = {'ok': HTTPStatus.OK, 'duplicate': HTTPStatus.OK, 'invalid': HTTPStatus.BAD_REQUEST,
+                'not_found': HTTPStatus.NOT_FOUND, 'error': HTTPStatus.SERVICE_UNAVAILABLE}
+MAX_BODY = 64 * 1024
+
+class CheckInServer:
+    """Minimal asyncio HTTP/JSON front end for CheckInService, for badge readers at the gates.
+
+    POST /punch   {"faculty_id": "123", "action": "Check-In", "timestamp": optional ISO string}
+    GET  /health  journal backlog, roster cache and punch index stats
+
+    Connections are kept alive, and each punch runs on the default thread
+    pool, so a roster cache miss never stalls other gates.
+    """
+
+    def __init__(self, service, host='127.0.0.1', port=8080):
+        self.service = service
+        self.host = host
+        self.port = port
+        self._server = None
+        self._loop = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        log.info(f"Check-in service listening on http://{self.host}:{self.port}")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self):
+        """Runs the server on its own event loop thread (used when embedded in the GUI)."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, name="CheckInServer", daemon=True).start()
+        ready.wait(5)
+
+    def stop(self):
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # --- HTTP handling ---
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'Malformed request line.'}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'Invalid Content-Length.'}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'Body too large.'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version.upper() == 'HTTP/1.1')
+                status, payload = await self._route(method.upper(), path, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        path = path.split('?', 1)[0]
+        if path == '/punch' and method == 'POST':
+            return await self._punch(body)
+        if path == '/health' and method == 'GET':
+            journal = self.service.journal
+            index = self.service.index
+            return HTTPStatus.OK, {'status': 'ok', 'pending_punches': journal.pending_count(),
+                                   'last_flush_error': journal.last_error, 'roster': self.service.roster.stats(),
+                                   'punch_index': index.stats() if index else None}
+        return HTTPStatus.NOT_FOUND, {'error': f"No route for {method} {path}."}
+
+    async def _punch(self, body):
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError as err:
+            return HTTPStatus.BAD_REQUEST, {'error': f"Invalid JSON body: {err}"}
+        if not isinstance(data, dict):
+            return HTTPStatus.BAD_REQUEST, {'error': "Expected a JSON object."}
+        try:
+            timestamp = datetime.fromisoformat(data['timestamp']) if data.get('timestamp') else None
+        except (ValueError, TypeError) as err:
+            return HTTPStatus.BAD_REQUEST, {'error': f"Invalid timestamp: {err}"}
+        if timestamp is not None and timestamp.tzinfo is not None:
+            # Attendance stores server local time without an offset.
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(None, self.service.punch,
+                                                str(data.get('faculty_id', '')), data.get('action'), timestamp)
+        except Exception as err:
+            log.exception("Punch failed")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'status': 'error', 'error': f"Internal error: {err}"}
+        return STATUS_CODES[result.status], result.to_dict()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode('utf-8')
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless HTTP/JSON check-in service for badge readers.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--journal', default='punch_journal.sqlite3', help="Local punch journal file.")
+    parser.add_argument('--reject-invalid', action='store_true',
+                        help="Refuse out-of-sequence punches (e.g. a second Check-In) instead of flagging them.")
+    parser.add_argument('--sqlite', metavar='PATH', help="Use a local SQLite database instead of the MSSQL server.")
+    parser.add_argument('--server', default=DEFAULT_SERVER)
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    backend = SQLiteBackend(args.sqlite) if args.sqlite else None
+    db_manager = DatabaseManager(server=args.server, database=args.database, backend=backend,
+                                 slow_log_path='slow_queries.log')
+    journal = PunchJournal(db_manager, path=args.journal)
+    rollups = RollupManager(db_manager, state_path=args.journal)
+    journal.listeners.append(rollups.on_punches_flushed)
+    journal.drained_listeners.append(rollups.retry_pending)
+    journal.start()
+
+    roster = RosterCache(db_manager)
+    log.info(f"Roster warmed up with {roster.warm_up()} faculty.")
+
+    index = PunchIndex(db_manager, journal)
+    index.start()
+    service = CheckInService(roster, journal, index, reject_invalid=args.reject_invalid)
+
+    try:
+        asyncio.run(CheckInServer(service, args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        index.stop()
+        journal.stop()
+        rollups.close()
+        db_manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# checkin_service.py
+
+import sqlite3
+from datetime import datetime
+
+from punch_index import ACCEPTED, DUPLICATE, ALREADY_CHECKED_IN, NOT_CHECKED_IN
+
+VALID_ACTIONS = ('Check-In', 'Check-Out')
+
+class PunchResult:
+    """Outcome of one punch. status is 'ok', 'duplicate', 'invalid', 'not_found' or 'error'.
+
+    'duplicate' means the same punch was already recorded moments ago and
+    nothing new was stored. An 'ok' punch that breaks the In/Out sequence
+    carries a warning.
+    """
+
+    def __init__(self, status, faculty_id, action, message, faculty=None, punch_id=None, warning=None):
+        self.status = status
+        self.faculty_id = faculty_id
+        self.action = action
+        self.message = message
+        self.faculty = faculty
+        self.punch_id = punch_id
+        self.warning = warning
+
+    @property
+    def ok(self):
+        return self.status == 'ok'
+
+    def to_dict(self):
+        return {
+            'status': self.status,
+            'faculty_id': self.faculty_id,
+            'action': self.action,
+            'message': self.message,
+            'full_name': self.faculty.full_name if self.faculty else None,
+            'punch_id': self.punch_id,
+            'warning': self.warning,
+        }
+
+class CheckInService:
+    """UI-independent punch logic shared by the Tk kiosk and the HTTP gate service.
+
+    Validates against the in-memory roster and writes to the local punch
+    journal, whose background flusher batches punches into dbo.Attendance.
+    With a PunchIndex, repeated taps are coalesced and out-of-sequence punches
+    flagged (or rejected, with reject_invalid) before anything is written.
+    Safe to call from several threads at once.
+    """
+
+    def __init__(self, roster, journal, index=None, reject_invalid=False):
+        self.roster = roster
+        self.journal = journal
+        self.index = index
+        self.reject_invalid = reject_invalid
+
+    def punch(self, faculty_id, action, timestamp=None):
+        faculty_id = (faculty_id or '').strip()
+        if not faculty_id:
+            return PunchResult('invalid', faculty_id, action, "Please enter Faculty ID.")
+        if action not in VALID_ACTIONS:
+            return PunchResult('invalid', faculty_id, action, f"Unknown action '{action}'.")
+
+        success, faculty = self.roster.lookup(faculty_id)
+        if not success:
+            # The roster could not be read; the ID may well be valid, so this is not 'not_found'.
+            return PunchResult('error', faculty_id, action,
+                               f"Could not look up Faculty ID '{faculty_id}'. Database Error: {faculty}")
+        if not faculty:
+            return PunchResult('not_found', faculty_id, action, f"Faculty ID '{faculty_id}' not found.")
+
+        # Stamped here rather than in the journal so the index sees the stored time.
+        timestamp = self.journal.normalize_timestamp(timestamp or datetime.now())
+        verdict, previous = self.index.claim(faculty_id, action, timestamp) if self.index else (ACCEPTED, None)
+        if verdict == DUPLICATE:
+            return PunchResult('duplicate', faculty_id, action,
+                               f"{action} for {faculty.full_name} was already recorded at {previous[1]:%H:%M:%S}.",
+                               faculty=faculty)
+
+        warning = self.transition_warning(verdict, previous)
+        if warning and self.reject_invalid:
+            self.index.restore(faculty_id, previous, action, timestamp)
+            return PunchResult('invalid', faculty_id, action, warning, faculty=faculty, warning=warning)
+
+        try:
+            punch_id = self.journal.record(faculty_id, action, timestamp)
+        except sqlite3.Error as err:
+            if self.index:
+                self.index.restore(faculty_id, previous, action, timestamp)
+            return PunchResult('error', faculty_id, action, f"Failed to record {action}. Journal Error: {err}",
+                               faculty=faculty)
+
+        self.journal.notify()
+        message = f"Attendance for {faculty.full_name} has been recorded.\nAction: {action}."
+        if warning:
+            message += f"\nNote: {warning}"
+        return PunchResult('ok', faculty_id, action, message, faculty=faculty, punch_id=punch_id, warning=warning)
+
+    @staticmethod
+    def transition_warning(verdict, previous):
+        if verdict == ALREADY_CHECKED_IN:
+            return f"Already checked in at {previous[1]:%H:%M:%S %m/%d} with no Check-Out since."
+        if verdict == NOT_CHECKED_IN:
+            return "No Check-In found before this Check-Out."
+        return None
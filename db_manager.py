@@ -1,175 +1,824 @@
-# db_manager.py
-
-import pyodbc 
-from faculty_model import Faculty
-from datetime import timedelta, datetime
-
-class DatabaseManager:
-    """Handles all communication with the MSSQL database using pyodbc."""
-
-    def __init__(self, server, database):
-        self.server = server
-        self.database = database
-        self.driver = '{ODBC Driver 17 for SQL Server}'
-        
-        self.user = 'aspnetfp_'
-        self.password = 'aspnetfinals'
-        
-        self.conn_str = (
-            f'DRIVER={self.driver};'
-            f'SERVER={self.server};'
-            f'DATABASE={self.database};'
-            f'UID={self.user};'
-            f'PWD={self.password}'
-        )
-
-    def execute_non_query(self, sql_query, params=None):
-        """Executes INSERT, UPDATE, DELETE queries."""
-        conn = None
-        try:
-            conn = pyodbc.connect(self.conn_str)
-            cursor = conn.cursor()
-            
-            if params:
-                cursor.execute(sql_query, params)
-            else:
-                cursor.execute(sql_query)
-                
-            conn.commit() 
-            return True, cursor.rowcount
-        except pyodbc.Error as err:
-            return False, str(err)
-        finally:
-            if conn:
-                conn.close()
-
-    def add_faculty(self, faculty_id, full_name, department):
-        """Inserts a new faculty member into the dbo.Faculty table."""
-        if self.load_faculty_info(faculty_id):
-            return False, f"Faculty ID {faculty_id} already exists."
-            
-        sql = "INSERT INTO dbo.Faculty (FacultyID, FullName, Department) VALUES (?, ?, ?)"
-        params = (faculty_id, full_name, department)
-        return self.execute_non_query(sql, params)
-
-    def load_faculty_info(self, faculty_id):
-        """Fetches faculty details based on ID from dbo.Faculty."""
-        conn = None
-        try:
-            conn = pyodbc.connect(self.conn_str)
-            cursor = conn.cursor()
-            
-            sql = "SELECT FacultyID, FullName, Department FROM dbo.Faculty WHERE FacultyID = ?"
-            cursor.execute(sql, (faculty_id,))
-            
-            result = cursor.fetchone()
-
-            if result:
-                return Faculty(result[0], result[1], result[2] if result[2] else "N/A")
-            return None
-        except pyodbc.Error as err:
-            print(f"Read Error: {err}")
-            return None
-        finally:
-            if conn:
-                conn.close()
-
-    def get_attendance_report(self):
-        """Fetches all faculty and applies the 8-hour shift logic."""
-        conn = None
-        report_data = []
-        try:
-            conn = pyodbc.connect(self.conn_str)
-            cursor = conn.cursor()
-
-            sql = """
-            SELECT 
-                F.FacultyID, 
-                F.FullName, 
-                T1.Timestamp AS LastActionTime,
-                T1.Action AS LastAction,
-                (SELECT MAX(Timestamp) FROM dbo.Attendance WHERE FacultyID = F.FacultyID AND Action = 'Check-In' 
-                 AND Timestamp < T1.Timestamp) AS PreviousCheckInTime 
-            FROM dbo.Faculty AS F
-            OUTER APPLY (
-                SELECT TOP 1 *
-                FROM dbo.Attendance AS A
-                WHERE A.FacultyID = F.FacultyID
-                ORDER BY A.Timestamp DESC
-            ) AS T1
-            ORDER BY F.FullName;
-            """
-            cursor.execute(sql)
-            results = cursor.fetchall()
-            
-            for row in results:
-                data = {
-                    'FacultyID': row[0],
-                    'FullName': row[1],
-                    'LastActionTime': row[2],
-                    'LastAction': row[3],
-                    'PreviousCheckInTime': row[4],
-                    'HoursRendered': None,
-                    'Note': "No Records"
-                }
-                
-                if data['LastAction'] == 'Check-In':
-                    data['Note'] = "Time-In" 
-                elif data['LastAction'] == 'Check-Out' and data['PreviousCheckInTime']:
-                    time_diff = data['LastActionTime'] - data['PreviousCheckInTime']
-                    data['HoursRendered'] = time_diff
-                    
-                    if time_diff >= timedelta(hours=8):
-                        data['Note'] = "**properly done**"
-                    else:
-                        data['Note'] = "**not done**"
-                
-                report_data.append(data)
-
-            return report_data
-        
-        except pyodbc.Error as err:
-            print(f"Report Error: {err}")
-            return []
-        finally:
-            if conn:
-                conn.close()
-
-    def get_raw_time_data(self):
-        """Fetches all Check-In and Check-Out times for today from dbo.Attendance."""
-        conn = None
-        try:
-            conn = pyodbc.connect(self.conn_str)
-            cursor = conn.cursor()
-
-            sql = """
-            SELECT 
-                FacultyID, 
-                Timestamp, 
-                Action 
-            FROM dbo.Attendance 
-            WHERE CAST(Timestamp AS DATE) = CAST(GETDATE() AS DATE) 
-            ORDER BY Timestamp;
-            """
-            cursor.execute(sql)
-            results = cursor.fetchall()
-            
-            organized_data = {}
-            for row in results:
-                fid, timestamp, action = row[0], row[1], row[2]
-                if fid not in organized_data:
-                    organized_data[fid] = {'check_ins': [], 'check_outs': []}
-                
-                if action == 'Check-In':
-                    organized_data[fid]['check_ins'].append(timestamp)
-                elif action == 'Check-Out':
-                    organized_data[fid]['check_outs'].append(timestamp)
-
-            return organized_data
-        
-        except pyodbc.Error as err:
-            print(f"Analytics Data Error: {err}")
-            return {}
-        finally:
-            if conn:
-                conn.close()
\ No newline at end of file
+# db_manager.py
+
+import logging
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from faculty_model import Faculty, AttendanceEvent, ReportRecord, DailyRollup
+from backends import MSSQLBackend
+from instrumentation import Instrumentation, instrumented
+from result_cache import ResultCache, cached
+import shift_engine
+from datetime import timedelta, datetime
+
+log = logging.getLogger(__name__)
+
+# Using a RAW STRING to correctly handle the backslash in the instance name.
+DEFAULT_SERVER = r'sql.bsite.net\MSSQL2016'
+DEFAULT_DATABASE = 'aspnetfp_'
+
+# Hours a work day needs for the report's "properly done" status.
+FULL_SHIFT = timedelta(hours=8)
+# Report notes; ReportRecord.status is the index into this tuple.
+REPORT_NOTES = ("No Records", "Time-In", "**not done**", "**properly done**")
+# Sort keys accepted by get_report_page, mapped to report columns and ReportRecord fields.
+REPORT_SORT_COLUMNS = {'name': 'FullName', 'department': 'Department', 'status': 'Status', 'id': 'FacultyID'}
+REPORT_SORT_FIELDS = {'name': 'full_name', 'department': 'department', 'status': 'status', 'id': 'faculty_id'}
+
+def day_bounds(day=None, days=1):
+    """Half-open [start, end) datetime range covering `days` days ending with `day` (default today).
+
+    Filtering with `Timestamp >= start AND Timestamp < end` lets MSSQL seek an
+    index on Timestamp, unlike `CAST(Timestamp AS DATE) = ...`.
+    """
+    day = day or datetime.now().date()
+    end = datetime.combine(day, datetime.min.time()) + timedelta(days=1)
+    return end - timedelta(days=days), end
+
+class PoolError(Exception):
+    """Raised when the connection pool cannot hand out a connection."""
+
+class PoolTimeoutError(PoolError):
+    """Raised when no pooled connection becomes free within the timeout."""
+
+class ConnectionPool:
+    """Thread-safe pool of reusable DB-API connections."""
+
+    def __init__(self, connect, errors, size=4, timeout=10.0, health_check_after=30.0):
+        self._connect = connect
+        # Exception type(s) the driver raises, e.g. pyodbc.Error.
+        self.errors = errors
+        self.size = size
+        self.timeout = timeout
+        # Connections idle for longer than this are pinged before being reused.
+        self.health_check_after = health_check_after
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+        self._counter_lock = threading.Lock()
+        self.in_use = 0
+        self.opened = 0
+        self.discarded = 0
+
+    def acquire(self):
+        """Borrows a live connection, opening or replacing one if needed."""
+        if self._closed:
+            raise PoolError("Connection pool is closed.")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeoutError(f"No database connection free after {self.timeout}s.")
+
+        try:
+            while True:
+                try:
+                    conn, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._connect()
+                    self._count(opened=1)
+                    break
+
+                if time.monotonic() - last_used < self.health_check_after or self._is_alive(conn):
+                    break
+                self._discard(conn)
+            self._count(in_use=1)
+            return conn
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn, broken=False):
+        """Returns a connection to the pool, dropping it if it is no longer usable."""
+        self._count(in_use=-1)
+        try:
+            if broken or self._closed:
+                self._discard(conn)
+                return
+            try:
+                conn.rollback()
+            except self.errors:
+                self._discard(conn)
+                return
+            self._idle.put((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that borrows a connection and always gives it back."""
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except self.errors:
+            # A failed statement may mean the link itself died; only keep the
+            # connection if it still answers a ping.
+            broken = not self._is_alive(conn)
+            raise
+        finally:
+            self.release(conn, broken=broken)
+
+    def close(self):
+        """Closes every idle connection and refuses further borrowing."""
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self):
+        return {'size': self.size, 'in_use': self.in_use, 'idle': self._idle.qsize(),
+                'opened': self.opened, 'discarded': self.discarded}
+
+    def _count(self, in_use=0, opened=0, discarded=0):
+        with self._counter_lock:
+            self.in_use += in_use
+            self.opened += opened
+            self.discarded += discarded
+
+    def _is_alive(self, conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            return True
+        except self.errors:
+            return False
+
+    def _discard(self, conn):
+        self._count(discarded=1)
+        try:
+            conn.close()
+        except self.errors:
+            pass
+
+class DatabaseManager:
+    """Handles all communication with the attendance database.
+
+    The production backend is MSSQL through pyodbc; pass backend=SQLiteBackend(path)
+    (see backends.py) to run against a local SQLite file instead.
+    """
+
+    def __init__(self, server=DEFAULT_SERVER, database=DEFAULT_DATABASE, pool_size=4, pool_timeout=10.0,
+                 use_rollups=False, backend=None, slow_query_ms=500.0, slow_log_path=None,
+                 cache_max_staleness=0.0):
+        self.server = server
+        self.database = database
+        self.backend = backend or MSSQLBackend(server, database)
+        # Everything a query can raise: driver errors plus pool exhaustion.
+        self.errors = (self.backend.Error, PoolError)
+
+        self.pool = ConnectionPool(self.backend.connect, self.backend.Error,
+                                   size=pool_size, timeout=pool_timeout)
+
+        # Read the report from dbo.AttendanceDaily (see rollup.py) instead of raw events.
+        self.use_rollups = use_rollups
+
+        # Per-method connect/execute/fetch timings and the slow-query log.
+        self.instrumentation = Instrumentation(slow_query_ms, slow_log_path)
+
+        # Report/analytics results, reused until the next write (see result_cache.py). Off by default.
+        self.cache = ResultCache(cache_max_staleness)
+
+    @contextmanager
+    def connection(self):
+        """Borrows a pooled connection: `with db.connection() as conn: ...`"""
+        probe = self.instrumentation.current()
+        start = time.perf_counter()
+        try:
+            with self.pool.connection() as conn:
+                if probe is not None:
+                    probe.add('connect', time.perf_counter() - start)
+                yield self.instrumentation.wrap(conn, probe)
+        except self.errors as err:
+            if probe is not None:
+                probe.error = probe.error or str(err)
+            self.cache.note_error()
+            raise
+
+    def close(self):
+        """Releases all pooled connections."""
+        self.pool.close()
+        self.backend.close()
+
+    @instrumented
+    def execute_non_query(self, sql_query, params=None):
+        """Executes INSERT, UPDATE, DELETE queries."""
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                if params:
+                    cursor.execute(sql_query, params)
+                else:
+                    cursor.execute(sql_query)
+                    
+                conn.commit() 
+                self.cache.bump()
+                return True, cursor.rowcount
+        except self.errors as err:
+            return False, str(err)
+
+    @instrumented
+    def insert_attendance_batch(self, rows, chunk_size=500):
+        """Inserts (FacultyID, Action, Timestamp) rows in multi-row batches.
+
+        Rows that already exist with the same FacultyID, Action and Timestamp are
+        skipped, so a batch that is retried after a lost acknowledgement is not
+        inserted twice.
+        """
+        inserted = 0
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                # MSSQL allows at most 2100 parameters per statement (3 per row here).
+                for start in range(0, len(rows), chunk_size):
+                    chunk = rows[start:start + chunk_size]
+                    sql = self.backend.insert_missing_attendance_sql(len(chunk))
+                    params = [value for row in chunk for value in row]
+                    cursor.execute(sql, params)
+                    inserted += max(cursor.rowcount, 0)
+                conn.commit()
+                self.cache.bump()
+            return True, inserted
+        except self.errors as err:
+            return False, str(err)
+
+    @instrumented
+    def add_faculty(self, faculty_id, full_name, department):
+        """Inserts a new faculty member into the dbo.Faculty table."""
+        # The existence check and the insert are one statement, so adding costs a single round trip.
+        sql = """
+        INSERT INTO dbo.Faculty (FacultyID, FullName, Department)
+        SELECT ?, ?, ?
+        WHERE NOT EXISTS (SELECT 1 FROM dbo.Faculty WHERE FacultyID = ?);
+        """
+        params = (faculty_id, full_name, department, faculty_id)
+        success, result = self.execute_non_query(sql, params)
+        if success and result == 0:
+            return False, f"Faculty ID {faculty_id} already exists."
+        return success, result
+
+    @instrumented
+    def bulk_add_faculty(self, rows, chunk_size=1000):
+        """Imports many faculty members with a few round trips per chunk.
+
+        `rows` is any iterable of (row_number, faculty_id, full_name, department)
+        and is consumed lazily. Yields (row_number, faculty_id, success, message)
+        for every input row.
+        """
+        seen = set()
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield from self._import_faculty_chunk(chunk, seen)
+                chunk = []
+        if chunk:
+            yield from self._import_faculty_chunk(chunk, seen)
+
+    def _import_faculty_chunk(self, chunk, seen):
+        results = {}
+        candidates = []
+        for row_number, faculty_id, full_name, department in chunk:
+            if not (faculty_id and full_name and department):
+                results[row_number] = (faculty_id, False, "All fields are required.")
+            elif faculty_id in seen:
+                results[row_number] = (faculty_id, False, "Duplicate Faculty ID in import file.")
+            else:
+                seen.add(faculty_id)
+                candidates.append((row_number, faculty_id, full_name, department))
+
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+
+                existing = set()
+                if candidates:
+                    # One set-based lookup for the whole chunk instead of one query per row.
+                    placeholders = ", ".join("?" * len(candidates))
+                    cursor.execute(f"SELECT FacultyID FROM dbo.Faculty WHERE FacultyID IN ({placeholders})",
+                                   [c[1] for c in candidates])
+                    existing = {str(row[0]) for row in cursor.fetchall()}
+
+                new_rows = []
+                for row_number, faculty_id, full_name, department in candidates:
+                    if str(faculty_id) in existing:
+                        results[row_number] = (faculty_id, False, f"Faculty ID {faculty_id} already exists.")
+                    else:
+                        new_rows.append((row_number, faculty_id, full_name, department))
+
+                if new_rows:
+                    self.backend.prepare_bulk(cursor)
+                    cursor.executemany("INSERT INTO dbo.Faculty (FacultyID, FullName, Department) VALUES (?, ?, ?)",
+                                       [r[1:] for r in new_rows])
+                    conn.commit()
+                    self.cache.bump()
+                    for row_number, faculty_id, _, _ in new_rows:
+                        results[row_number] = (faculty_id, True, "Added.")
+        except self.errors:
+            # Typically a concurrent insert of one of these IDs; retry the rows individually
+            # so only the conflicting ones are reported as failed.
+            for row_number, faculty_id, full_name, department in candidates:
+                if row_number not in results:
+                    success, result = self.add_faculty(faculty_id, full_name, department)
+                    results[row_number] = (faculty_id, success, "Added." if success else str(result))
+
+        for row_number, _, _, _ in chunk:
+            faculty_id, success, message = results[row_number]
+            yield row_number, faculty_id, success, message
+
+    @staticmethod
+    def make_faculty(faculty_id, full_name, department):
+        """Builds a Faculty from a dbo.Faculty row."""
+        # Interned so the few distinct department names are shared across the roster.
+        return Faculty(faculty_id, full_name, sys.intern(department) if department else "N/A")
+
+    @instrumented
+    def lookup_faculty(self, faculty_id):
+        """Like load_faculty_info, but returns (success, Faculty or None) so a
+        missing ID can be told apart from a failed query."""
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                sql = "SELECT FacultyID, FullName, Department FROM dbo.Faculty WHERE FacultyID = ?"
+                cursor.execute(sql, (faculty_id,))
+                
+                result = cursor.fetchone()
+
+            if result:
+                return True, self.make_faculty(result[0], result[1], result[2])
+            return True, None
+        except self.errors as err:
+            return False, str(err)
+
+    def load_faculty_info(self, faculty_id):
+        """Fetches faculty details based on ID from dbo.Faculty."""
+        success, result = self.lookup_faculty(faculty_id)
+        if not success:
+            log.error(f"Read Error: {result}")
+            return None
+        return result
+
+    @instrumented
+    def load_all_faculty(self):
+        """Fetches the whole dbo.Faculty roster in one query."""
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT FacultyID, FullName, Department FROM dbo.Faculty")
+                results = cursor.fetchall()
+            return [self.make_faculty(row[0], row[1], row[2]) for row in results]
+        except self.errors as err:
+            log.error(f"Read Error: {err}")
+            return []
+
+    @staticmethod
+    def build_report_record(faculty_id, full_name, last_action_time, last_action, worked_seconds,
+                            department=None):
+        """Builds one ReportRecord and applies the 8-hour shift logic.
+
+        worked_seconds is the time rendered on the faculty's latest work day, as
+        paired by shift_engine (all sessions that day, overnight shifts included).
+        """
+        hours_rendered = timedelta(seconds=worked_seconds) if worked_seconds else None
+        
+        if last_action is None:
+            note = "No Records"
+        elif last_action == 'Check-In':
+            note = "Time-In" 
+        elif hours_rendered and hours_rendered >= FULL_SHIFT:
+            note = "**properly done**"
+        else:
+            note = "**not done**"
+
+        return ReportRecord(faculty_id, full_name, sys.intern(department) if department else department,
+                            last_action_time, sys.intern(last_action) if last_action else last_action,
+                            hours_rendered, note, REPORT_NOTES.index(note))
+
+    def _shift_worked_seconds(self, latest, chunk_size=500):
+        """{FacultyID: seconds worked on their latest work day} for (FacultyID, LastActionTime)
+        pairs, pairing the punches with shift_engine. Used when there are no rollups.
+
+        Faculty are fetched in groups whose last actions fall within a day of
+        each other, so each one only reads about [last work day - MAX_SESSION,
+        last action] however long ago that was.
+        """
+        latest = sorted(((fid, last_time) for fid, last_time in latest if last_time is not None),
+                        key=lambda pair: pair[1])
+        groups, group = [], []
+        for fid, last_time in latest:
+            if group and (len(group) >= chunk_size or last_time.date() - group[0][1].date() > timedelta(days=1)):
+                groups.append(group)
+                group = []
+            group.append((fid, last_time))
+        if group:
+            groups.append(group)
+
+        worked = {}
+        for group in groups:
+            # Far enough back to see the Check-In of an overnight shift ending on the last day.
+            start = datetime.combine(group[0][1].date(), datetime.min.time()) - shift_engine.MAX_SESSION
+            end = group[-1][1] + timedelta(seconds=1)
+            success, events = self.get_events_between(start, end, [fid for fid, _ in group])
+            if not success:
+                log.error(f"Report Error: {events}")
+                continue
+            sessions = shift_engine.pair_sessions(events, now=datetime.now())
+            totals = shift_engine.daily_totals(sessions)
+            # Whole seconds, as stored in AttendanceDaily.WorkedSeconds.
+            worked.update((fid, int(seconds)) for fid, seconds in shift_engine.latest_worked_seconds(totals).items())
+        return worked
+
+    @cached
+    @instrumented
+    def get_attendance_report(self):
+        """Fetches all faculty and applies the 8-hour shift logic."""
+        if self.use_rollups:
+            report_data = self.get_rollup_report()
+            if report_data is not None:
+                return report_data
+        success, report_data = self._event_report()
+        if not success:
+            log.error(f"Report Error: {report_data}")
+            return []
+        return report_data
+
+    @cached
+    def _event_report(self):
+        """The report computed from dbo.Attendance, hours paired by shift_engine.
+        Returns (success, records or error message)."""
+        try:
+            sql = """
+            WITH Ranked AS (
+                SELECT 
+                    A.FacultyID,
+                    A.Timestamp,
+                    A.Action,
+                    ROW_NUMBER() OVER (PARTITION BY A.FacultyID ORDER BY A.Timestamp DESC) AS RowNum
+                FROM dbo.Attendance AS A
+            )
+            SELECT 
+                F.FacultyID, 
+                F.FullName, 
+                R.Timestamp AS LastActionTime,
+                R.Action AS LastAction,
+                F.Department
+            FROM dbo.Faculty AS F
+            LEFT JOIN Ranked AS R ON R.FacultyID = F.FacultyID AND R.RowNum = 1
+            ORDER BY F.FullName;
+            """
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql)
+                results = cursor.fetchall()
+            
+            worked = self._shift_worked_seconds((row[0], row[2]) for row in results)
+            return True, [self.build_report_record(row[0], row[1], row[2], row[3], worked.get(row[0]), row[4])
+                          for row in results]
+        
+        except self.errors as err:
+            return False, str(err)
+
+    @instrumented
+    def get_rollup_report(self):
+        """Same rows as get_attendance_report, read from dbo.AttendanceDaily: the last
+        action from each faculty's latest row, hours from the latest row with a
+        Check-In. Returns None if the rollup table is unavailable."""
+        sql = """
+        WITH Latest AS (
+            SELECT 
+                D.FacultyID, D.LastActionTime, D.LastAction,
+                ROW_NUMBER() OVER (PARTITION BY D.FacultyID ORDER BY D.WorkDate DESC) AS RowNum
+            FROM dbo.AttendanceDaily AS D
+        ),
+        Worked AS (
+            SELECT 
+                D.FacultyID, D.WorkedSeconds,
+                ROW_NUMBER() OVER (PARTITION BY D.FacultyID ORDER BY D.WorkDate DESC) AS RowNum
+            FROM dbo.AttendanceDaily AS D
+            WHERE D.CheckIns > 0
+        )
+        SELECT F.FacultyID, F.FullName, L.LastActionTime, L.LastAction, W.WorkedSeconds, F.Department
+        FROM dbo.Faculty AS F
+        LEFT JOIN Latest AS L ON L.FacultyID = F.FacultyID AND L.RowNum = 1
+        LEFT JOIN Worked AS W ON W.FacultyID = F.FacultyID AND W.RowNum = 1
+        ORDER BY F.FullName;
+        """
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql)
+                results = cursor.fetchall()
+
+            return [self.build_report_record(row[0], row[1], row[2], row[3], row[4], row[5]) for row in results]
+        except self.errors as err:
+            log.error(f"Rollup Report Error: {err}")
+            return None
+
+    def _report_source_sql(self, faculty_where):
+        """Per-faculty report columns from dbo.AttendanceDaily plus a Status code
+        matching build_report_record.
+
+        Each faculty's latest rollup rows are found with index seeks, so a page
+        sorted by name only touches the faculty on that page.
+        """
+        latest = f"""
+        SELECT F.FacultyID, F.FullName, COALESCE(F.Department, '') AS Department,
+               D.LastActionTime, D.LastAction, W.WorkedSeconds
+        FROM dbo.Faculty AS F
+        LEFT JOIN dbo.AttendanceDaily AS D ON D.FacultyID = F.FacultyID
+            AND D.WorkDate = (SELECT MAX(X.WorkDate) FROM dbo.AttendanceDaily AS X
+                              WHERE X.FacultyID = F.FacultyID)
+        LEFT JOIN dbo.AttendanceDaily AS W ON W.FacultyID = F.FacultyID
+            AND W.WorkDate = (SELECT MAX(X.WorkDate) FROM dbo.AttendanceDaily AS X
+                              WHERE X.FacultyID = F.FacultyID AND X.CheckIns > 0)
+        {faculty_where}
+        """
+        return f"""
+        SELECT L.*,
+            CASE WHEN L.LastAction IS NULL THEN 0
+                 WHEN L.LastAction = 'Check-In' THEN 1
+                 WHEN L.WorkedSeconds >= {int(FULL_SHIFT.total_seconds())} THEN 3
+                 ELSE 2 END AS Status
+        FROM ({latest}) AS L
+        """
+
+    @staticmethod
+    def _report_filter(search=None, department=None):
+        """WHERE clause and params on dbo.Faculty for the paged report."""
+        clauses, params = [], []
+        if search:
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            clauses.append("F.FullName LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        if department:
+            clauses.append("F.Department = ?")
+            params.append(department)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _query_report(self, sql, params):
+        """Runs one paged-report query. Returns (success, rows or error)."""
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, params)
+                return True, cursor.fetchall()
+        except self.errors as err:
+            log.error(f"Report Page Error: {err}")
+            return False, str(err)
+
+    @staticmethod
+    def _filter_report(records, search=None, department=None, status=None):
+        """The in-memory counterpart of _report_filter plus the Status filter."""
+        search = search.lower() if search else None
+        return [record._replace(department=record.department or '') for record in records
+                if (not search or search in record.full_name.lower())
+                and (not department or record.department == department)
+                and (status is None or record.status == status)]
+
+    @cached
+    @instrumented
+    def get_report_page(self, sort='name', descending=False, after=None, limit=100,
+                        search=None, department=None, status=None):
+        """One page of the attendance report, ordered by `sort` then FacultyID.
+
+        Keyset pagination: `after` is the (sort value, FacultyID) of the last row
+        of the previous page, so every page is a seek instead of an OFFSET scan.
+        `search` matches part of FullName, `department` is exact and `status` is
+        an index into REPORT_NOTES. Returns (success, records or error message).
+
+        Pages are read from dbo.AttendanceDaily. Without rollups the whole report
+        is computed from dbo.Attendance (as get_attendance_report does) and paged
+        in memory, since hours and status need every session paired.
+        """
+        if self.use_rollups:
+            column = f"R.{REPORT_SORT_COLUMNS[sort]}"
+            direction, op = ('DESC', '<') if descending else ('ASC', '>')
+            faculty_where, params = self._report_filter(search, department)
+            clauses = []
+            if status is not None:
+                clauses.append("R.Status = ?")
+                params.append(status)
+            if after is not None:
+                clauses.append(f"({column} {op} ? OR ({column} = ? AND R.FacultyID {op} ?))")
+                params += [after[0], after[0], after[1]]
+            sql = f"""
+            SELECT R.FacultyID, R.FullName, R.Department, R.LastActionTime, R.LastAction, R.WorkedSeconds
+            FROM ({self._report_source_sql(faculty_where)}) AS R
+            {"WHERE " + " AND ".join(clauses) if clauses else ""}
+            ORDER BY {column} {direction}, R.FacultyID {direction}
+            {self.backend.limit_sql()};
+            """
+            success, result = self._query_report(sql, params + [limit])
+            if success:
+                return True, [self.build_report_record(row[0], row[1], row[3], row[4], row[5], row[2])
+                              for row in result]
+
+        success, records = self._event_report()
+        if not success:
+            return False, records
+        field = REPORT_SORT_FIELDS[sort]
+        key = lambda record: (getattr(record, field), record.faculty_id)
+        records = self._filter_report(records, search, department, status)
+        if after is not None:
+            after = tuple(after)
+            records = [record for record in records if (key(record) < after if descending else key(record) > after)]
+        return True, sorted(records, key=key, reverse=descending)[:limit]
+
+    @cached
+    @instrumented
+    def count_report_rows(self, search=None, department=None, status=None):
+        """Number of rows get_report_page can return for these filters, or None on error."""
+        faculty_where, params = self._report_filter(search, department)
+        if status is None:
+            success, result = self._query_report(f"SELECT COUNT(*) FROM dbo.Faculty AS F{faculty_where};", params)
+            return result[0][0] if success else None
+        if self.use_rollups:
+            sql = f"""
+            SELECT COUNT(*) FROM ({self._report_source_sql(faculty_where)}) AS R
+            WHERE R.Status = ?;
+            """
+            success, result = self._query_report(sql, params + [status])
+            if success:
+                return result[0][0]
+        success, records = self._event_report()
+        return len(self._filter_report(records, search, department, status)) if success else None
+
+    @cached
+    @instrumented
+    def get_departments(self):
+        """Distinct non-empty departments, for the report filter."""
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                SELECT DISTINCT Department FROM dbo.Faculty
+                WHERE Department IS NOT NULL AND Department <> ''
+                ORDER BY Department;
+                """)
+                return [row[0] for row in cursor.fetchall()]
+        except self.errors as err:
+            log.error(f"Read Error: {err}")
+            return []
+
+    def get_raw_time_data(self, day=None):
+        """One day's (default today) punches as columnar AttendanceEvents.
+
+        Formerly a dict of per-faculty lists of datetimes; the arrays hold the
+        same information in a fraction of the memory.
+        """
+        return self.get_attendance_events(*day_bounds(day))
+
+    @cached
+    def get_attendance_events(self, start, end):
+        """Fetches punches with start <= Timestamp < end as columnar AttendanceEvents
+        (empty on error)."""
+        try:
+            return self.fetch_attendance_events(start, end)
+        except self.errors as err:
+            log.error(f"Analytics Data Error: {err}")
+            from analytics_engine import AttendanceEvents
+            return AttendanceEvents.empty()
+
+    @instrumented
+    def fetch_attendance_events(self, start, end):
+        """Like get_attendance_events, but raises one of self.errors on failure, for
+        batch jobs that must not mistake an error for a day without punches."""
+        # Imported here so kiosk and gate startup don't pay for numpy.
+        from analytics_engine import AttendanceEvents
+        # Timestamps come back as epoch seconds so no per-row datetime objects are built.
+        sql = f"""
+        SELECT 
+            A.FacultyID, 
+            F.Department, 
+            {self.backend.epoch_seconds('A.Timestamp')} AS EpochSeconds, 
+            A.Action 
+        FROM dbo.Attendance AS A
+        LEFT JOIN dbo.Faculty AS F ON F.FacultyID = A.FacultyID
+        WHERE A.Timestamp >= ? AND A.Timestamp < ?;
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, (start, end))
+            results = cursor.fetchall()
+
+        return AttendanceEvents.from_rows(results)
+
+    @staticmethod
+    def _attendance_filter(start=None, end=None, department=None):
+        """WHERE clause and params for the export queries (half-open date range)."""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("A.Timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("A.Timestamp < ?")
+            params.append(end)
+        if department:
+            clauses.append("F.Department = ?")
+            params.append(department)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @cached
+    @instrumented
+    def count_attendance(self, start=None, end=None, department=None):
+        """Number of rows iter_attendance would yield (for progress reporting)."""
+        where, params = self._attendance_filter(start, end, department)
+        sql = f"""
+        SELECT COUNT(*)
+        FROM dbo.Attendance AS A
+        LEFT JOIN dbo.Faculty AS F ON F.FacultyID = A.FacultyID{where};
+        """
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, params)
+                return cursor.fetchone()[0]
+        except self.errors as err:
+            log.error(f"Export Count Error: {err}")
+            return None
+
+    @instrumented
+    def iter_attendance(self, start=None, end=None, department=None, chunk_size=5000):
+        """Streams (FacultyID, FullName, Department, Timestamp, Action) rows in
+        fetchmany chunks, so memory stays constant however much history there is.
+
+        Yields lists of at most chunk_size rows. Holds one pooled connection until
+        the generator is exhausted or closed; raises one of self.errors on failure.
+        """
+        where, params = self._attendance_filter(start, end, department)
+        sql = f"""
+        SELECT A.FacultyID, F.FullName, F.Department, A.Timestamp, A.Action
+        FROM dbo.Attendance AS A
+        LEFT JOIN dbo.Faculty AS F ON F.FacultyID = A.FacultyID{where}
+        ORDER BY A.Timestamp;
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+
+    @instrumented
+    def get_events_between(self, start, end, faculty_ids=None):
+        """Fetches AttendanceEvents with start <= Timestamp < end, ordered by time,
+        optionally for some faculty only. Returns (success, events or error)."""
+        sql = "SELECT FacultyID, Timestamp, Action FROM dbo.Attendance WHERE Timestamp >= ? AND Timestamp < ?"
+        params = [start, end]
+        if faculty_ids:
+            sql += f" AND FacultyID IN ({', '.join('?' * len(faculty_ids))})"
+            params.extend(faculty_ids)
+        sql += " ORDER BY Timestamp;"
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, params)
+                return True, [AttendanceEvent(row[0], row[1], sys.intern(row[2])) for row in cursor.fetchall()]
+        except self.errors as err:
+            return False, str(err)
+
+    @instrumented
+    def upsert_daily_rollups(self, rows):
+        """MERGEs rollup rows (see rollup.compute_daily_rollups) into dbo.AttendanceDaily."""
+        if not rows:
+            return True, 0
+        sql = self.backend.upsert_rollup_sql()
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                self.backend.prepare_bulk(cursor)
+                cursor.executemany(sql, rows)
+                conn.commit()
+                self.cache.bump()
+            return True, len(rows)
+        except self.errors as err:
+            return False, str(err)
+
+    @cached
+    @instrumented
+    def get_daily_rollups(self, start_date, end_date):
+        """Fetches dbo.AttendanceDaily rows with start_date <= WorkDate < end_date.
+
+        Returns a list of DailyRollup."""
+        sql = """
+        SELECT FacultyID, WorkDate, FirstIn, LastOut, WorkedSeconds, OnTime, OrphanPunches
+        FROM dbo.AttendanceDaily
+        WHERE WorkDate >= ? AND WorkDate < ?;
+        """
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, (start_date, end_date))
+                return [DailyRollup(*row) for row in cursor.fetchall()]
+        except self.errors as err:
+            log.error(f"Rollup Read Error: {err}")
+            return []
\ No newline at end of file
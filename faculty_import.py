@@ -0,0 +1,103 @@
+# faculty_import.py
+
+import argparse
+import csv
+import os
+from db_manager import DatabaseManager, DEFAULT_SERVER, DEFAULT_DATABASE
+
+REQUIRED_COLUMNS = ('FacultyID', 'FullName', 'Department')
+
+def _column_names(reader):
+    """The file's header names for REQUIRED_COLUMNS; ValueError if any is missing."""
+    columns = {name.strip().lower(): name for name in (reader.fieldnames or [])}
+    missing = [c for c in REQUIRED_COLUMNS if c.lower() not in columns]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+    return [columns[c.lower()] for c in REQUIRED_COLUMNS]
+
+def check_faculty_csv(csv_path):
+    """Raises OSError if the CSV cannot be read or ValueError if its header lacks a column."""
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        _column_names(csv.DictReader(f))
+
+def read_faculty_csv(csv_path):
+    """Streams (row_number, faculty_id, full_name, department) from a CSV with
+    FacultyID, FullName and Department columns (header names are case-insensitive)."""
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        keys = _column_names(reader)
+        # Row 1 is the header, so data starts at row 2 (matches what spreadsheets show).
+        for row_number, row in enumerate(reader, start=2):
+            yield (row_number, *[(row.get(k) or '').strip() for k in keys])
+
+def default_report_path(csv_path):
+    base, _ = os.path.splitext(csv_path)
+    return f"{base}_import_report.csv"
+
+def import_faculty_csv(db_manager, csv_path, report_path=None, roster=None, progress=None, chunk_size=1000):
+    """Imports a faculty CSV and writes a per-row report CSV.
+
+    roster: optional RosterCache to write successful rows through to.
+    progress: optional callback(processed, added, failed), called once per chunk.
+    Returns (added, failed, report_path).
+    """
+    report_path = report_path or default_report_path(csv_path)
+    rows = {}
+
+    def remember(source):
+        # Keep name/department of the in-flight chunk for the roster write-through.
+        for row in source:
+            if roster is not None:
+                rows[row[0]] = row
+            yield row
+
+    # Fail before creating the report, not after writing its header.
+    check_faculty_csv(csv_path)
+    added = failed = processed = 0
+    with open(report_path, 'w', newline='', encoding='utf-8') as report_file:
+        writer = csv.writer(report_file)
+        writer.writerow(['Row', 'FacultyID', 'Status', 'Message'])
+
+        for row_number, faculty_id, success, message in db_manager.bulk_add_faculty(
+                remember(read_faculty_csv(csv_path)), chunk_size=chunk_size):
+            writer.writerow([row_number, faculty_id, 'OK' if success else 'FAILED', message])
+            processed += 1
+            if success:
+                added += 1
+            else:
+                failed += 1
+
+            source = rows.pop(row_number, None)
+            if success and source is not None:
+                _, fid, full_name, department = source
+                roster.put(fid, db_manager.make_faculty(fid, full_name, department))
+
+            if progress and processed % chunk_size == 0:
+                progress(processed, added, failed)
+
+    if progress:
+        progress(processed, added, failed)
+    return added, failed, report_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import faculty members from a CSV file.")
+    parser.add_argument('csv_path', help="CSV with FacultyID, FullName, Department columns.")
+    parser.add_argument('--report', help="Where to write the per-row result CSV.")
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--server', default=DEFAULT_SERVER)
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(server=args.server, database=args.database, pool_size=1)
+    try:
+        added, failed, report_path = import_faculty_csv(
+            db_manager, args.csv_path, args.report, chunk_size=args.chunk_size,
+            progress=lambda done, ok, bad: print(f"  {done} rows processed ({ok} added, {bad} failed)"))
+        print(f"Import finished: {added} added, {failed} failed. Report: {report_path}")
+    except (OSError, ValueError) as err:
+        print(f"Error: {err}")
+    finally:
+        db_manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,39 @@
-# faculty_model.py
-
-class Person:
-    """Base class for all people in the system."""
-    
-    def __init__(self, faculty_id, full_name):
-        self.faculty_id = faculty_id
-        self.full_name = full_name
-
-    def __str__(self):
-        return f"{self.full_name} ({self.faculty_id})"
-
-class Faculty(Person):
-    """Represents a faculty member, inheriting from Person."""
-    
-    def __init__(self, faculty_id, full_name, department="General"):
-        super().__init__(faculty_id, full_name)
-        self.department = department
-        
-    def get_info(self):
-        return f"{self.__str__()} - Dept: {self.department}"
\ No newline at end of file
+# faculty_model.py
+
+from collections import namedtuple
+
+class Person:
+    """Base class for all people in the system."""
+
+    # No per-instance __dict__: the roster cache can hold tens of thousands of these.
+    __slots__ = ('faculty_id', 'full_name')
+    
+    def __init__(self, faculty_id, full_name):
+        self.faculty_id = faculty_id
+        self.full_name = full_name
+
+    def __str__(self):
+        return f"{self.full_name} ({self.faculty_id})"
+
+class Faculty(Person):
+    """Represents a faculty member, inheriting from Person."""
+
+    __slots__ = ('department',)
+    
+    def __init__(self, faculty_id, full_name, department="General"):
+        super().__init__(faculty_id, full_name)
+        self.department = department
+        
+    def get_info(self):
+        return f"{self.__str__()} - Dept: {self.department}"
+
+# One punch from dbo.Attendance.
+AttendanceEvent = namedtuple('AttendanceEvent', 'faculty_id timestamp action')
+
+# One row of the attendance status report (see DatabaseManager.build_report_record).
+ReportRecord = namedtuple('ReportRecord', 'faculty_id full_name department last_action_time last_action '
+                                          'hours_rendered note status')
+
+# One dbo.AttendanceDaily row as read by DatabaseManager.get_daily_rollups.
+DailyRollup = namedtuple('DailyRollup', 'faculty_id work_date first_in last_out worked_seconds on_time '
+                                        'orphan_punches')
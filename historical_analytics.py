@@ -0,0 +1,357 @@
+# historical_analytics.py
+
+import argparse
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from analytics_engine import CHECK_IN, CHECK_OUT, ON_TIME_BOUNDARY, BUCKET_SECONDS, SECONDS_PER_DAY
+from backends import SQLiteBackend
+from db_manager import DatabaseManager, DEFAULT_SERVER, DEFAULT_DATABASE
+
+# Days of punches each worker task fetches and aggregates.
+CHUNK_DAYS = 14
+
+# Value columns shared by department and faculty totals.
+SUMS = ('check_ins', 'check_outs', 'in_sum', 'out_sum', 'on_time')
+
+class Totals:
+    """Rows of summable values keyed by name.
+
+    Every column is a count or a sum, so totals from different chunks merge by
+    concatenating and re-summing rows with the same key; averages and rates are
+    only taken once everything is merged.
+    """
+
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.values = values
+
+    @classmethod
+    def grouped(cls, keys, values):
+        unique, inverse = np.unique(keys, return_inverse=True)
+        summed = np.zeros((len(unique), values.shape[1]))
+        np.add.at(summed, inverse.ravel(), values)
+        return cls(unique, summed)
+
+    @classmethod
+    def empty(cls, width):
+        return cls(np.empty(0, str), np.zeros((0, width)))
+
+    def merge(self, other):
+        return Totals.grouped(np.concatenate([self.keys, other.keys]), np.vstack([self.values, other.values]))
+
+def _group_sums(groups, group_count, columns):
+    return np.column_stack([np.bincount(groups, weights=column, minlength=group_count) for column in columns])
+
+def _histogram(groups, group_count, buckets, bucket_count, mask):
+    counts = np.bincount(groups[mask] * bucket_count + buckets[mask], minlength=group_count * bucket_count)
+    return counts.reshape(group_count, bucket_count)
+
+def _mean(sums, counts):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+def _percent(part, whole):
+    return np.divide(part * 100.0, whole, out=np.zeros(len(whole)), where=whole > 0)
+
+class HistoricalAggregate:
+    """Partial analytics for one or more chunks of a date range.
+
+    departments     per department: SUMS, then check-in and check-out time-of-day histograms
+    faculty         per faculty: SUMS
+    faculty_months  per 'FacultyID|YYYY-MM': check_ins, on_time, in_sum
+    """
+
+    def __init__(self, departments, faculty, faculty_months, faculty_departments, bucket_seconds=BUCKET_SECONDS):
+        self.departments = departments
+        self.faculty = faculty
+        self.faculty_months = faculty_months
+        self.faculty_departments = faculty_departments  # FacultyID -> department name
+        self.bucket_seconds = bucket_seconds
+
+    @classmethod
+    def empty(cls, bucket_seconds=BUCKET_SECONDS):
+        bucket_count = SECONDS_PER_DAY // bucket_seconds
+        return cls(Totals.empty(len(SUMS) + 2 * bucket_count), Totals.empty(len(SUMS)), Totals.empty(3), {},
+                   bucket_seconds)
+
+    @classmethod
+    def from_events(cls, events, on_time_boundary=ON_TIME_BOUNDARY, bucket_seconds=BUCKET_SECONDS):
+        """Aggregates one chunk of AttendanceEvents."""
+        if not len(events):
+            return cls.empty(bucket_seconds)
+
+        sod = events.seconds_of_day()
+        is_in = events.action == CHECK_IN
+        is_out = events.action == CHECK_OUT
+        on_time = is_in & (sod <= on_time_boundary)
+        columns = (is_in, is_out, np.where(is_in, sod, 0), np.where(is_out, sod, 0), on_time)
+
+        bucket_count = SECONDS_PER_DAY // bucket_seconds
+        buckets = sod // bucket_seconds
+        department_count = len(events.department_names)
+        department_index = events.faculty_department[events.faculty_index]
+        departments = Totals(events.department_names, np.hstack([
+            _group_sums(department_index, department_count, columns),
+            _histogram(department_index, department_count, buckets, bucket_count, is_in),
+            _histogram(department_index, department_count, buckets, bucket_count, is_out),
+        ]))
+
+        faculty_count = len(events.faculty_ids)
+        faculty = Totals(events.faculty_ids, _group_sums(events.faculty_index, faculty_count, columns))
+
+        # One row per faculty and calendar month; epochs are server local time, like the timestamps.
+        month = events.epoch.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+        first_month = month.min()
+        month_count = month.max() - first_month + 1
+        codes = events.faculty_index.astype(np.int64) * month_count + (month - first_month)
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        month_names = np.datetime_as_string((first_month + unique_codes % month_count).astype('datetime64[M]'))
+        keys = np.char.add(np.char.add(events.faculty_ids[unique_codes // month_count], '|'), month_names)
+        faculty_months = Totals(keys, _group_sums(inverse.ravel(), len(unique_codes),
+                                                  (is_in, on_time, np.where(is_in, sod, 0))))
+
+        faculty_departments = dict(zip(events.faculty_ids.tolist(),
+                                       events.department_names[events.faculty_department].tolist()))
+        return cls(departments, faculty, faculty_months, faculty_departments, bucket_seconds)
+
+    def merge(self, other):
+        return HistoricalAggregate(self.departments.merge(other.departments), self.faculty.merge(other.faculty),
+                                   self.faculty_months.merge(other.faculty_months),
+                                   {**self.faculty_departments, **other.faculty_departments}, self.bucket_seconds)
+
+    def result(self):
+        """Final statistics as a dict of plain values and NumPy arrays.
+
+        'histogram' has the same shape as analytics_engine.by_time_of_day and
+        'departments' the fields of analytics_engine.by_department it shares.
+        """
+        sums = dict(zip(SUMS, self.departments.values[:, :len(SUMS)].T))
+        bucket_count = SECONDS_PER_DAY // self.bucket_seconds
+        in_histogram = self.departments.values[:, len(SUMS):len(SUMS) + bucket_count]
+        out_histogram = self.departments.values[:, len(SUMS) + bucket_count:]
+
+        check_ins, check_outs = int(sums['check_ins'].sum()), int(sums['check_outs'].sum())
+        total = check_ins + check_outs
+        summary = {
+            'events': total,
+            'check_ins': check_ins,
+            'check_outs': check_outs,
+            'avg_in_sec': float(sums['in_sum'].sum()) / check_ins if check_ins else None,
+            'avg_out_sec': float(sums['out_sum'].sum()) / check_outs if check_outs else None,
+            'in_rate': check_ins / total * 100 if total else 0,
+            'out_rate': check_outs / total * 100 if total else 0,
+            'on_time_percentage': float(sums['on_time'].sum()) / check_ins * 100 if check_ins else 0,
+        }
+
+        departments = {
+            'departments': self.departments.keys,
+            'check_ins': sums['check_ins'].astype(np.int64),
+            'check_outs': sums['check_outs'].astype(np.int64),
+            'avg_in_sec': _mean(sums['in_sum'], sums['check_ins']),
+            'avg_out_sec': _mean(sums['out_sum'], sums['check_outs']),
+            'on_time_percentage': _percent(sums['on_time'], sums['check_ins']),
+            'in_histogram': in_histogram.astype(np.int64),
+            'out_histogram': out_histogram.astype(np.int64),
+        }
+
+        histogram = {
+            'bucket_start_sec': np.arange(bucket_count) * self.bucket_seconds,
+            'check_ins': in_histogram.sum(axis=0).astype(np.int64),
+            'check_outs': out_histogram.sum(axis=0).astype(np.int64),
+        }
+
+        faculty_sums = dict(zip(SUMS, self.faculty.values.T))
+        faculty = {
+            'faculty_ids': self.faculty.keys,
+            'departments': np.array([self.faculty_departments.get(fid, "N/A") for fid in self.faculty.keys.tolist()]),
+            'check_ins': faculty_sums['check_ins'].astype(np.int64),
+            'avg_in_sec': _mean(faculty_sums['in_sum'], faculty_sums['check_ins']),
+            'on_time_percentage': _percent(faculty_sums['on_time'], faculty_sums['check_ins']),
+        }
+
+        return {'summary': summary, 'departments': departments, 'histogram': histogram,
+                'faculty': faculty, 'trend': self._trend(self.faculty.keys)}
+
+    def _trend(self, faculty_ids):
+        """Monthly punctuality per faculty (rows aligned with faculty_ids) and its linear slope."""
+        keys = [key.rsplit('|', 1) for key in self.faculty_months.keys.tolist()]
+        fids = np.array([fid for fid, _ in keys], dtype=str)
+        months = np.array([month for _, month in keys], dtype=str)
+        month_names, month_index = np.unique(months, return_inverse=True)
+        row = np.searchsorted(faculty_ids, fids)
+
+        shape = (len(faculty_ids), len(month_names))
+        check_ins, on_time, in_sum = (np.zeros(shape) for _ in range(3))
+        for target, column in zip((check_ins, on_time, in_sum), self.faculty_months.values.T):
+            target[row, month_index.ravel()] = column
+
+        on_time_percentage = _mean(on_time * 100.0, check_ins)
+        avg_in_sec = _mean(in_sum, check_ins)
+
+        # Least-squares slope of the on-time rate over the months each faculty has check-ins in.
+        has_data = check_ins > 0
+        x = np.arange(len(month_names), dtype=np.float64)
+        y = np.where(has_data, on_time_percentage, 0)
+        n = has_data.sum(axis=1)
+        sx, sxx = has_data @ x, has_data @ (x * x)
+        sy, sxy = y.sum(axis=1), (y * x).sum(axis=1)
+        denominator = n * sxx - sx * sx
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slope = np.where(denominator > 0, (n * sxy - sx * sy) / denominator, np.nan)
+
+        return {'months': month_names, 'on_time_percentage': on_time_percentage, 'avg_in_sec': avg_in_sec,
+                'on_time_slope': slope}
+
+def chunk_ranges(start, end, chunk_days=CHUNK_DAYS):
+    """Splits [start, end) into consecutive half-open ranges of at most chunk_days days."""
+    ranges = []
+    while start < end:
+        ranges.append((start, min(start + timedelta(days=chunk_days), end)))
+        start = ranges[-1][1]
+    return ranges
+
+def database_source(db_manager):
+    """Picklable description of db_manager's database, so a worker process can open it again."""
+    backend = db_manager.backend
+    if isinstance(backend, SQLiteBackend):
+        return 'sqlite', backend.path
+    return 'mssql', backend.server, backend.database
+
+def open_database(source, pool_size=1):
+    if source[0] == 'sqlite':
+        return DatabaseManager(backend=SQLiteBackend(source[1]), pool_size=pool_size)
+    return DatabaseManager(server=source[1], database=source[2], pool_size=pool_size)
+
+_worker_db = None  # DatabaseManager of the current worker process
+
+def _init_worker(source):
+    global _worker_db
+    _worker_db = open_database(source)
+
+def _aggregate_chunk(start, end, on_time_boundary, bucket_seconds):
+    events = _worker_db.fetch_attendance_events(start, end)
+    return HistoricalAggregate.from_events(events, on_time_boundary, bucket_seconds)
+
+def run_historical_analytics(db_manager, start, end, workers=None, chunk_days=CHUNK_DAYS, progress=None,
+                             on_time_boundary=ON_TIME_BOUNDARY, bucket_seconds=BUCKET_SECONDS):
+    """Computes analytics for punches with start <= Timestamp < end across a process pool.
+
+    The range is cut into chunk_days chunks; each worker process fetches and
+    aggregates whole chunks over its own connection, and the partial totals
+    are merged here as they finish. workers defaults to the CPU count.
+    progress: optional callback(chunks_done, chunk_count).
+
+    Returns (True, HistoricalAggregate.result() dict) or (False, error message).
+    """
+    chunks = chunk_ranges(start, end, chunk_days)
+    merged = HistoricalAggregate.empty(bucket_seconds)
+    if not chunks:
+        return True, merged.result()
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+    # spawn, not fork: the caller may be the Tk process, with threads and open connections.
+    context = multiprocessing.get_context('spawn')
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(database_source(db_manager),)) as pool:
+            futures = [pool.submit(_aggregate_chunk, chunk_start, chunk_end, on_time_boundary, bucket_seconds)
+                       for chunk_start, chunk_end in chunks]
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    merged = merged.merge(future.result())
+                    if progress:
+                        progress(done, len(chunks))
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
+    except db_manager.errors + (BrokenProcessPool, OSError) as err:
+        return False, str(err)
+    return True, merged.result()
+
+def format_report(result, top=5):
+    """Plain-text summary of a run_historical_analytics result."""
+    def clock(seconds):
+        if seconds is None or np.isnan(seconds):
+            return "N/A"
+        return f"{int(seconds // 3600):02d}:{int(seconds % 3600 // 60):02d}:{int(seconds % 60):02d}"
+
+    summary = result['summary']
+    lines = [
+        f"Events:                   {summary['events']} ({summary['check_ins']} check-ins, {summary['check_outs']} check-outs)",
+        f"Average Check-In Time:    {clock(summary['avg_in_sec'])}",
+        f"Average Check-Out Time:   {clock(summary['avg_out_sec'])}",
+        f"Percentage On-Time/Early: {summary['on_time_percentage']:.2f}%",
+        "",
+        "--- By Department ---",
+    ]
+    departments = result['departments']
+    for name, ins, avg_in, avg_out, on_time in zip(departments['departments'], departments['check_ins'],
+                                                   departments['avg_in_sec'], departments['avg_out_sec'],
+                                                   departments['on_time_percentage']):
+        lines.append(f"{name:<20} Check-ins: {ins:<7} Avg In: {clock(avg_in)}  Avg Out: {clock(avg_out)}  "
+                     f"On-Time: {on_time:.1f}%")
+
+    trend = result['trend']
+    if len(trend['months']) > 1:
+        faculty_ids = result['faculty']['faculty_ids']
+        slope = trend['on_time_slope']
+        ranked = [i for i in np.argsort(slope) if not np.isnan(slope[i])]
+        lines += ["", f"--- Punctuality Trend, {trend['months'][0]} to {trend['months'][-1]} "
+                      f"(on-time points per month) ---"]
+        lines += [f"Improving: {faculty_ids[i]:<12} {slope[i]:+.1f}" for i in reversed(ranked[-top:])]
+        lines += [f"Declining: {faculty_ids[i]:<12} {slope[i]:+.1f}" for i in ranked[:top]]
+    return "\n".join(lines)
+
+def _to_json(value):
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, np.ndarray):
+        # NaN (no data) becomes null.
+        return np.where(np.isnan(value), None, value).tolist() if value.dtype.kind == 'f' else value.tolist()
+    return value
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d')
+
+def main():
+    parser = argparse.ArgumentParser(description="Semester/year attendance analytics computed across worker processes.")
+    parser.add_argument('--start', type=_parse_date, required=True, help="First day (YYYY-MM-DD).")
+    parser.add_argument('--end', type=_parse_date, help="Last day, inclusive (YYYY-MM-DD, default today).")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count).")
+    parser.add_argument('--chunk-days', type=int, default=CHUNK_DAYS)
+    parser.add_argument('--json', metavar='PATH', help="Also write the full result (per-faculty trends, histograms) as JSON.")
+    parser.add_argument('--sqlite', metavar='PATH', help="Use a local SQLite database instead of the MSSQL server.")
+    parser.add_argument('--server', default=DEFAULT_SERVER)
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    args = parser.parse_args()
+
+    # --end is inclusive on the command line; the query range is half-open.
+    end = (args.end or datetime.combine(datetime.now().date(), datetime.min.time())) + timedelta(days=1)
+
+    source = ('sqlite', args.sqlite) if args.sqlite else ('mssql', args.server, args.database)
+    db_manager = open_database(source)
+    try:
+        success, result = run_historical_analytics(
+            db_manager, args.start, end, args.workers, args.chunk_days,
+            progress=lambda done, total: print(f"  {done}/{total} chunks"))
+    finally:
+        db_manager.close()
+
+    if not success:
+        print(f"Error: {result}")
+        return
+    print(format_report(result))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(_to_json(result), f, indent=2)
+        print(f"Wrote {args.json}")
+
+if __name__ == "__main__":
+    main()
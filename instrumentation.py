@@ -0,0 +1,268 @@
+# instrumentation.py
+
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PHASES = ('connect', 'execute', 'fetch')
+
+class LatencyHistogram:
+    """Fixed log-spaced buckets (0.05 ms .. ~2 min), so recording is cheap and memory is constant."""
+
+    BOUNDS_MS = [round(0.05 * 1.25 ** i, 3) for i in range(66)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        lo, hi = 0, len(self.BOUNDS_MS)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.BOUNDS_MS[mid] < ms:
+                lo = mid + 1
+            else:
+                hi = mid
+        self.counts[lo] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (q in 0..100)."""
+        if not self.count:
+            return None
+        target = q / 100 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target and c:
+                return min(self.BOUNDS_MS[i] if i < len(self.BOUNDS_MS) else self.max_ms, self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'avg_ms': self.total_ms / self.count if self.count else None,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_ms if self.count else None,
+        }
+
+class MethodStats:
+    """Histograms and counters for one DatabaseManager method."""
+
+    def __init__(self):
+        self.total = LatencyHistogram()
+        self.phases = {phase: LatencyHistogram() for phase in PHASES}
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.slow = 0
+
+class Probe:
+    """Timings for one call, filled in by the instrumented connection/cursor."""
+
+    def __init__(self, method):
+        self.method = method
+        self.started = time.perf_counter()
+        self.phase_ms = dict.fromkeys(PHASES, 0.0)
+        self.rows = 0
+        self.error = None
+        self.sql = None
+
+    def add(self, phase, seconds):
+        self.phase_ms[phase] += seconds * 1000
+
+class InstrumentedCursor:
+    """Cursor proxy that charges execute/fetch time and row counts to a Probe."""
+
+    def __init__(self, cursor, probe):
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_probe', probe)
+
+    def _timed(self, phase, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        except Exception as err:
+            self._probe.error = str(err)
+            raise
+        finally:
+            self._probe.add(phase, time.perf_counter() - start)
+
+    def execute(self, sql, *args):
+        self._probe.sql = sql
+        self._timed('execute', self._cursor.execute, sql, *args)
+        return self
+
+    def executemany(self, sql, params):
+        self._probe.sql = sql
+        self._timed('execute', self._cursor.executemany, sql, params)
+        return self
+
+    def fetchone(self):
+        row = self._timed('fetch', self._cursor.fetchone)
+        self._probe.rows += row is not None
+        return row
+
+    def fetchmany(self, size):
+        rows = self._timed('fetch', self._cursor.fetchmany, size)
+        self._probe.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed('fetch', self._cursor.fetchall)
+        self._probe.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors report to a Probe; commits count as execute time."""
+
+    def __init__(self, conn, probe):
+        self._conn = conn
+        self._probe = probe
+
+    def cursor(self):
+        return InstrumentedCursor(self._conn.cursor(), self._probe)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            self._conn.commit()
+        finally:
+            self._probe.add('execute', time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+class Instrumentation:
+    """Per-method latency histograms (connect/execute/fetch/total), row counts and a slow-query log."""
+
+    def __init__(self, slow_query_ms=500.0, slow_log_path=None):
+        self.slow_query_ms = slow_query_ms
+        self.started = time.time()
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.slow_log = logging.getLogger('attendance.slow_queries')
+        if slow_log_path and not any(getattr(h, 'baseFilename', None) == os.path.abspath(slow_log_path)
+                                     for h in self.slow_log.handlers):
+            handler = logging.FileHandler(slow_log_path, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self.slow_log.addHandler(handler)
+            self.slow_log.setLevel(logging.INFO)
+
+    # --- Collecting ---
+    def current(self):
+        """The probe of the instrumented call running on this thread, if any."""
+        return getattr(self._local, 'probe', None)
+
+    @contextmanager
+    def active(self, probe):
+        previous = self.current()
+        self._local.probe = probe
+        try:
+            yield probe
+        finally:
+            self._local.probe = previous
+
+    def wrap(self, conn, probe):
+        return InstrumentedConnection(conn, probe) if probe is not None else conn
+
+    def finish(self, probe, total_ms):
+        with self._lock:
+            stats = self._stats.setdefault(probe.method, MethodStats())
+            stats.calls += 1
+            stats.rows += probe.rows
+            stats.errors += probe.error is not None
+            stats.total.record(total_ms)
+            for phase, ms in probe.phase_ms.items():
+                if ms:
+                    stats.phases[phase].record(ms)
+            slow = self.slow_query_ms is not None and total_ms >= self.slow_query_ms
+            stats.slow += slow
+
+        if slow:
+            sql = " ".join((probe.sql or "").split())[:300]
+            phases = " ".join(f"{p}={ms:.1f}ms" for p, ms in probe.phase_ms.items())
+            self.slow_log.warning(f"SLOW {probe.method} total={total_ms:.1f}ms {phases} rows={probe.rows}"
+                                  f"{' error=' + probe.error if probe.error else ''} sql={sql}")
+
+    # --- Reporting ---
+    def snapshot(self):
+        """{method: {'calls', 'errors', 'rows', 'slow', 'total': {...}, 'connect': {...}, ...}}"""
+        with self._lock:
+            return {
+                method: dict({'calls': s.calls, 'errors': s.errors, 'rows': s.rows, 'slow': s.slow,
+                              'total': s.total.summary()},
+                             **{phase: h.summary() for phase, h in s.phases.items()})
+                for method, s in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+def instrumented(func):
+    """Decorator for DatabaseManager methods: records one Probe per call.
+
+    For generator methods only the time spent producing rows is counted,
+    not the time the consumer spends between rows.
+    """
+    name = func.__name__
+
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(self, *args, **kwargs):
+            instr = self.instrumentation
+            probe = Probe(name)
+            busy = 0.0
+            inner = func(self, *args, **kwargs)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        with instr.active(probe):
+                            item = next(inner)
+                    except StopIteration:
+                        return
+                    except Exception as err:
+                        probe.error = probe.error or str(err)
+                        raise
+                    finally:
+                        busy += time.perf_counter() - start
+                    yield item
+            finally:
+                inner.close()
+                instr.finish(probe, busy * 1000)
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        instr = self.instrumentation
+        probe = Probe(name)
+        try:
+            with instr.active(probe):
+                return func(self, *args, **kwargs)
+        except Exception as err:
+            probe.error = probe.error or str(err)
+            raise
+        finally:
+            instr.finish(probe, (time.perf_counter() - probe.started) * 1000)
+    return wrapper
@@ -0,0 +1,161 @@
+# punch_index.py
+
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import shift_engine
+
+log = logging.getLogger(__name__)
+
+# Verdicts from PunchIndex.claim()
+ACCEPTED = 'accepted'
+DUPLICATE = 'duplicate'                    # same action again within duplicate_window
+ALREADY_CHECKED_IN = 'already_checked_in'  # Check-In while a Check-In is still open
+NOT_CHECKED_IN = 'not_checked_in'          # Check-Out with no open Check-In
+
+class PunchIndex:
+    """In-memory FacultyID -> (last action, timestamp) index for validating punches.
+
+    claim() decides whether a punch repeats the previous one within
+    duplicate_window (a double tap or a bouncing badge reader) or breaks the
+    In/Out sequence, without a database round trip.
+
+    The index is seeded with the last MAX_SESSION of punches from the server
+    plus anything still in the local journal, and sync() folds in punches
+    other kiosks and gates have flushed since. Applying a punch is idempotent
+    (an older timestamp never replaces newer state), so sync windows may
+    overlap freely.
+    """
+
+    def __init__(self, db_manager, journal=None, duplicate_window=shift_engine.DOUBLE_TAP,
+                 max_session=shift_engine.MAX_SESSION, sync_interval=10.0, sync_overlap=timedelta(minutes=10)):
+        self.db_manager = db_manager
+        self.journal = journal
+        self.duplicate_window = duplicate_window
+        # An open Check-In older than this is a missed Check-Out, not a shift in progress.
+        self.max_session = max_session
+        self.sync_interval = sync_interval
+        # Punches reach the server late (journal batching, offline kiosks); re-read this far back.
+        self.sync_overlap = sync_overlap
+        self.last_error = None
+
+        self._state = {}  # faculty_id -> (action, timestamp)
+        self._synced_until = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    # --- Validation ---
+    def claim(self, faculty_id, action, timestamp):
+        """Checks a punch against the faculty's last one and, unless it is a
+        duplicate, makes it the new last punch.
+
+        Returns (verdict, previous) where previous is the (action, timestamp)
+        it replaced, or None. Pass it to restore() if the punch is rejected or
+        could not be stored after all.
+        """
+        with self._lock:
+            previous = self._state.get(faculty_id)
+            verdict = self._verdict(previous, action, timestamp)
+            if verdict != DUPLICATE and (previous is None or timestamp >= previous[1]):
+                self._state[faculty_id] = (action, timestamp)
+            return verdict, previous
+
+    def _verdict(self, previous, action, timestamp):
+        if previous is None:
+            # Before the first seed an unknown faculty proves nothing.
+            seeded = self._synced_until is not None
+            return NOT_CHECKED_IN if action == 'Check-Out' and seeded else ACCEPTED
+        last_action, last_time = previous
+        if last_action == action and abs(timestamp - last_time) <= self.duplicate_window:
+            return DUPLICATE
+        if timestamp < last_time:
+            return ACCEPTED  # back-dated punch; nothing reliable to compare with
+        open_shift = last_action == 'Check-In' and timestamp - last_time <= self.max_session
+        if action == 'Check-In' and open_shift:
+            return ALREADY_CHECKED_IN
+        if action == 'Check-Out' and not open_shift:
+            return NOT_CHECKED_IN
+        return ACCEPTED
+
+    def restore(self, faculty_id, previous, action, timestamp):
+        """Undoes a claim() of (action, timestamp) whose punch was not recorded,
+        unless a later punch has been claimed since."""
+        with self._lock:
+            if self._state.get(faculty_id) != (action, timestamp):
+                return
+            if previous is None:
+                self._state.pop(faculty_id, None)
+            else:
+                self._state[faculty_id] = previous
+
+    def last_punch(self, faculty_id):
+        """(action, timestamp) of the faculty's last known punch, or None."""
+        with self._lock:
+            return self._state.get(faculty_id)
+
+    # --- Keeping in step with the server ---
+    def apply(self, punches):
+        """Folds in (FacultyID, Action, Timestamp) punches; matches PunchJournal.listeners."""
+        with self._lock:
+            for faculty_id, action, timestamp in punches:
+                previous = self._state.get(faculty_id)
+                if previous is None or timestamp >= previous[1]:
+                    self._state[faculty_id] = (action, timestamp)
+
+    def seed(self):
+        """Loads recent punches from the server and the local journal.
+        Returns (success, faculty indexed or error)."""
+        now = datetime.now()
+        success, result = self._load(now - self.max_session, now)
+        if not success:
+            return False, result
+        if self.journal is not None:
+            self.apply(self.journal.pending_punches())
+        with self._lock:
+            return True, len(self._state)
+
+    def sync(self):
+        """Picks up punches flushed by other instances since the last sync.
+        Returns (success, punches read or error)."""
+        if self._synced_until is None:
+            return self.seed()
+        now = datetime.now()
+        return self._load(self._synced_until - self.sync_overlap, now)
+
+    def _load(self, start, now):
+        # A little past now, in case another kiosk's clock runs ahead.
+        success, events = self.db_manager.get_events_between(start, now + timedelta(minutes=5))
+        if not success:
+            self.last_error = events
+            return False, events
+        self.apply((event.faculty_id, event.action, event.timestamp) for event in events)
+        self._synced_until = now
+        self.last_error = None
+        return True, len(events)
+
+    def start(self):
+        """Seeds the index, then syncs every sync_interval seconds on a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="PunchIndexSync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            success, result = self.sync()
+            if not success:
+                log.warning(f"Punch Index Sync Error: {result}")
+            self._stopping.wait(self.sync_interval)
+
+    def stats(self):
+        with self._lock:
+            synced_until = self._synced_until.isoformat(sep=' ', timespec='seconds') if self._synced_until else None
+            return {'size': len(self._state), 'synced_until': synced_until, 'last_error': self.last_error}
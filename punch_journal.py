@@ -0,0 +1,168 @@
+# punch_journal.py
+
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+class PunchJournal:
+    """Durable local write-ahead journal for Check-In/Check-Out punches.
+
+    Punches are committed to a local SQLite file the moment they happen and a
+    background thread drains them to dbo.Attendance in batches, so the kiosk
+    never waits on (or loses a punch to) the remote server.
+    """
+
+    def __init__(self, db_manager, path='punch_journal.sqlite3', batch_size=500,
+                 flush_interval=2.0, max_backoff=60.0, batch_window=0.2):
+        self.db_manager = db_manager
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        # After a notify(), wait this long so punches arriving together share one insert.
+        self.batch_window = batch_window
+        self.last_error = None
+        # Callables run with each batch of (FacultyID, Action, Timestamp) once it is on the server.
+        self.listeners = []
+        # Callables run after each background flush cycle that leaves the journal empty.
+        self.drained_listeners = []
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS punches (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                punch_id TEXT NOT NULL UNIQUE,
+                faculty_id TEXT NOT NULL,
+                action TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT
+            )""")
+        self._conn.commit()
+
+    # --- Writing ---
+    def record(self, faculty_id, action, timestamp=None):
+        """Durably stores a punch locally and returns its idempotency key."""
+        timestamp = self.normalize_timestamp(timestamp or datetime.now())
+        punch_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO punches (punch_id, faculty_id, action, ts) VALUES (?, ?, ?, ?)",
+                (punch_id, faculty_id, action, timestamp.isoformat()))
+            self._conn.commit()
+        return punch_id
+
+    @staticmethod
+    def normalize_timestamp(timestamp):
+        """Truncates to 10 ms, which MSSQL DATETIME stores exactly, so re-sent punches match."""
+        return timestamp.replace(microsecond=timestamp.microsecond // 10000 * 10000)
+
+    def pending_punches(self):
+        """(FacultyID, Action, Timestamp) of every punch not yet on the server, oldest first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT faculty_id, action, ts FROM punches ORDER BY seq").fetchall()
+        return [(fid, action, datetime.fromisoformat(ts)) for fid, action, ts in rows]
+
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM punches").fetchone()[0]
+
+    # --- Flushing ---
+    def flush_once(self):
+        """Sends up to one batch to the server. Returns (success, rows_sent or error)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, faculty_id, action, ts FROM punches ORDER BY seq LIMIT ?",
+                (self.batch_size,)).fetchall()
+        if not rows:
+            return True, 0
+
+        batch = [(fid, action, datetime.fromisoformat(ts)) for _, fid, action, ts in rows]
+        success, result = self.db_manager.insert_attendance_batch(batch)
+
+        seqs = [(row[0],) for row in rows]
+        with self._lock:
+            if success:
+                self._conn.executemany("DELETE FROM punches WHERE seq = ?", seqs)
+            else:
+                self._conn.executemany(
+                    "UPDATE punches SET attempts = attempts + 1, last_error = ? WHERE seq = ?",
+                    [(str(result), seq) for (seq,) in seqs])
+            self._conn.commit()
+
+        self.last_error = None if success else result
+        if success:
+            for listener in self.listeners:
+                try:
+                    listener(batch)
+                except Exception as err:
+                    log.exception(f"Journal Listener Error: {err}")
+        return success, len(rows) if success else result
+
+    def flush(self):
+        """Drains the whole journal now. Returns True if it is empty afterwards."""
+        while True:
+            success, sent = self.flush_once()
+            if not success:
+                return False
+            if sent < self.batch_size:
+                return True
+
+    def start(self):
+        """Starts the background flusher thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="PunchJournalFlusher", daemon=True)
+        self._thread.start()
+
+    def notify(self):
+        """Wakes the flusher early, e.g. right after a punch."""
+        self._wakeup.set()
+
+    def stop(self, flush=True, timeout=5.0):
+        """Stops the flusher, optionally making one last attempt to drain the journal."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        if flush:
+            self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def _run(self):
+        delay = self.flush_interval
+        while not self._stopping.is_set():
+            woken = self._wakeup.wait(delay)
+            if woken and not self._stopping.is_set():
+                self._stopping.wait(self.batch_window)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                drained = self.flush()
+            except Exception as err:
+                self.last_error = str(err)
+                drained = False
+            # Back off while the server is unreachable instead of hammering it.
+            delay = self.flush_interval if drained else min(max(delay, self.flush_interval) * 2, self.max_backoff)
+            if not drained:
+                log.warning(f"Journal Flush Error: {self.last_error}")
+                continue
+            for listener in self.drained_listeners:
+                try:
+                    listener()
+                except Exception as err:
+                    log.exception(f"Journal Listener Error: {err}")
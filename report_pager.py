@@ -0,0 +1,114 @@
+# report_pager.py
+
+from db_manager import REPORT_SORT_FIELDS
+
+class ReportPager:
+    """Sliding window over the attendance report, paged with DatabaseManager.get_report_page.
+
+    At most `max_pages` pages are held. Scrolling past either end fetches the
+    neighbouring page by keyset and drops a page from the other end, so memory
+    and Treeview size stay flat however large the roster is.
+
+    fetch() runs on a worker thread with arguments captured by one of the
+    *_request() methods; apply() then updates the window on the UI thread and
+    ignores pages fetched for an older sort/filter.
+    """
+
+    def __init__(self, db_manager, page_size=100, max_pages=3):
+        self.db_manager = db_manager
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.query = {'sort': 'name', 'descending': False, 'search': None, 'department': None, 'status': None}
+        self.rows = []
+        self.start_key = None  # key of the row just before rows[0]; None at the top
+        self.has_before = False
+        self.has_after = False
+
+    def key(self, record):
+        return getattr(record, REPORT_SORT_FIELDS[self.query['sort']]), record.faculty_id
+
+    def set_query(self, **changes):
+        """Changes the sort or filters; the window goes back to the top."""
+        self.query = dict(self.query, **changes)
+        self.rows = []
+        self.start_key = None
+        self.has_before = self.has_after = False
+
+    # --- UI thread: arguments for fetch() ---
+    def first_request(self):
+        return 'load', self.query, None, self.page_size, False
+
+    def reload_request(self):
+        """Re-reads the rows currently in the window (picks up new punches)."""
+        return 'reload', self.query, self.start_key, max(len(self.rows), self.page_size), False
+
+    def next_request(self):
+        return 'next', self.query, self.key(self.rows[-1]), self.page_size, False
+
+    def previous_request(self):
+        return 'previous', self.query, self.key(self.rows[0]), self.page_size, True
+
+    # --- Worker thread ---
+    def fetch(self, mode, query, after, limit, reverse):
+        """Returns (mode, query, success, rows, extra). One row beyond `limit` is
+        read so the caller knows whether more rows follow; that row is `extra`."""
+        descending = query['descending'] != reverse
+        success, rows = self.db_manager.get_report_page(
+            query['sort'], descending, after, limit + 1,
+            query['search'], query['department'], query['status'])
+        if not success:
+            return mode, query, False, rows, None
+        # The page may be a shared cached result (see result_cache.py), so it is sliced, not modified.
+        extra = rows[limit] if len(rows) > limit else None
+        rows = rows[limit - 1::-1] if reverse else rows[:limit]
+        return mode, query, True, rows, extra
+
+    # --- UI thread ---
+    def apply(self, result):
+        """Folds a fetched page into the window.
+
+        Returns (added, dropped) record lists for the view to insert/remove, or
+        None if the page is stale or the fetch failed.
+        """
+        mode, query, success, rows, extra = result
+        if not success or query != self.query:
+            return None
+
+        if mode in ('load', 'reload'):
+            dropped, self.rows = self.rows, rows
+            if mode == 'load':
+                self.start_key = None
+            self.has_before = self.start_key is not None
+            self.has_after = extra is not None
+            return rows, dropped
+
+        limit = self.page_size * self.max_pages
+        stale = self._drop_held(rows)
+        if mode == 'next':
+            self.rows = self.rows + rows
+            self.has_after = extra is not None
+            dropped = self.rows[:-limit] if len(self.rows) > limit else []
+            if dropped:
+                self.rows = self.rows[len(dropped):]
+                self.start_key = self.key(dropped[-1])
+                self.has_before = True
+            return rows, stale + dropped
+
+        # 'previous': rows were read backwards, so `extra` is the row just before them.
+        self.rows = rows + self.rows
+        self.start_key = self.key(extra) if extra is not None else None
+        self.has_before = extra is not None
+        dropped = self.rows[limit:]
+        if dropped:
+            self.rows = self.rows[:limit]
+            self.has_after = True
+        return rows, stale + dropped
+
+    def _drop_held(self, rows):
+        """Removes window rows for faculty that a new page brings back. Their sort
+        value (e.g. status) changed between fetches, so the copy held is out of place."""
+        faculty_ids = {record.faculty_id for record in rows}
+        stale = [record for record in self.rows if record.faculty_id in faculty_ids]
+        if stale:
+            self.rows = [record for record in self.rows if record.faculty_id not in faculty_ids]
+        return stale
@@ -0,0 +1,115 @@
+# result_cache.py
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+class ResultCache:
+    """Query results kept until the data they were read from changes.
+
+    Every successful write through DatabaseManager bumps `version`; an entry
+    is only served while the version it was read at is current, and for at
+    most max_staleness seconds (writes made by other kiosks, gates or
+    instances are not seen here, so this bounds how out of date a result can
+    be). max_staleness=None never expires entries; 0 disables the cache.
+
+    Cached results are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_staleness=0.0, max_entries=256):
+        self.max_staleness = max_staleness
+        self.max_entries = max_entries
+        self.version = 0
+
+        self._entries = OrderedDict()  # key -> (version, stored_at, value)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.max_staleness is None or self.max_staleness > 0
+
+    def get(self, key):
+        """Returns (True, value) for a current entry, else (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, stored_at, value = entry
+                fresh = self.max_staleness is None or time.monotonic() - stored_at <= self.max_staleness
+                if version == self.version and fresh:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, version, value):
+        """Stores a result read at `version`; dropped if a write has happened since."""
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def bump(self):
+        """Invalidates every entry; called after each successful write."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    # Failed queries are logged and answered with an empty result by most
+    # read methods, which must not be cached; connection() counts them here.
+    def note_error(self):
+        self._local.errors = self.errors_on_thread() + 1
+
+    def errors_on_thread(self):
+        return getattr(self._local, 'errors', 0)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'version': self.version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+def cached(func):
+    """Decorator for DatabaseManager read methods: repeat calls with the same
+    arguments are answered from self.cache until a write or max_staleness.
+
+    bypass_cache=True always queries (e.g. to notice writes made elsewhere)
+    and stores the fresh result for later callers.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, bypass_cache=False, **kwargs):
+        cache = self.cache
+        if not cache.enabled:
+            return func(self, *args, **kwargs)
+
+        key = (name, args, tuple(sorted(kwargs.items())))
+        if not bypass_cache:
+            hit, value = cache.get(key)
+            if hit:
+                return value
+
+        version = cache.version
+        errors = cache.errors_on_thread()
+        value = func(self, *args, **kwargs)
+        failed = cache.errors_on_thread() != errors or value is None or (
+            isinstance(value, tuple) and len(value) == 2 and value[0] is False)
+        if not failed:
+            cache.put(key, version, value)
+        return value
+    return wrapper
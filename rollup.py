@@ -0,0 +1,217 @@
+# rollup.py
+
+import argparse
+import logging
+import sqlite3
+import threading
+import time as clock
+from datetime import date, datetime, timedelta, time
+import shift_engine
+from db_manager import DatabaseManager, DEFAULT_SERVER, DEFAULT_DATABASE
+
+log = logging.getLogger(__name__)
+
+ON_TIME_BOUNDARY = time(8, 0, 0)
+
+def compute_daily_rollups(events, work_dates=None, now=None):
+    """Summarizes (FacultyID, Timestamp, Action) events, sorted by Timestamp,
+    into one row per faculty and day:
+
+    (FacultyID, WorkDate, FirstIn, LastIn, LastOut, LastAction, LastActionTime,
+     CheckIns, CheckOuts, WorkedSeconds, OnTime, OrphanPunches)
+
+    WorkedSeconds and OrphanPunches come from shift_engine, which credits an
+    overnight shift to the day it started, so `events` should reach
+    MAX_SESSION either side of the days wanted. Only days in `work_dates`
+    (default: every day seen) are returned.
+    """
+    events = list(events)
+    totals = shift_engine.daily_totals(shift_engine.pair_sessions(events, now=now))
+
+    days = {}
+    for fid, timestamp, action in events:
+        work_date = timestamp.date()
+        if work_dates is not None and work_date not in work_dates:
+            continue
+        key = (fid, work_date)
+        day = days.get(key)
+        if day is None:
+            day = days[key] = {'first_in': None, 'last_in': None, 'last_out': None, 'last_action': None,
+                               'last_time': None, 'ins': 0, 'outs': 0}
+
+        if action == 'Check-In':
+            day['ins'] += 1
+            day['first_in'] = day['first_in'] or timestamp
+            day['last_in'] = timestamp
+        elif action == 'Check-Out':
+            day['outs'] += 1
+            day['last_out'] = timestamp
+        day['last_action'] = action
+        day['last_time'] = timestamp
+
+    rows = []
+    for key, d in days.items():
+        total = totals.get(key)
+        worked = int(total.worked_seconds) if total else 0
+        orphans = total.missed_check_outs + total.missed_check_ins if total else 0
+        rows.append((key[0], key[1], d['first_in'], d['last_in'], d['last_out'], d['last_action'], d['last_time'],
+                     d['ins'], d['outs'], worked,
+                     bool(d['first_in'] and d['first_in'].time() <= ON_TIME_BOUNDARY), orphans))
+    return rows
+
+class RollupManager:
+    """Keeps dbo.AttendanceDaily in step with dbo.Attendance.
+
+    New punches only re-summarize the (faculty, day) pairs they touch;
+    rebuild() backfills a whole date range one day at a time.
+
+    Pairs waiting to be re-summarized are kept in a local SQLite file
+    (state_path, normally the punch journal's) until their rows are written,
+    so a failed refresh is retried by retry_pending() rather than lost once
+    the journal has dropped the punches.
+    """
+
+    def __init__(self, db_manager, state_path=None, max_backoff=60.0):
+        self.db_manager = db_manager
+        self.max_backoff = max_backoff
+        self.last_error = None
+
+        self._lock = threading.Lock()
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._pending = 0
+
+        self._conn = sqlite3.connect(state_path or ':memory:', check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_pending (
+                faculty_id TEXT NOT NULL,
+                work_date TEXT NOT NULL,
+                PRIMARY KEY (faculty_id, work_date)
+            )""")
+        self._conn.commit()
+        self._count_pending()
+
+    def refresh(self, keys, on_written=None):
+        """Re-summarizes the given (FacultyID, date) pairs. Returns (success, rows written or error).
+
+        on_written(work_date, faculty_ids) is called after each day's rows are stored."""
+        by_day = {}
+        for fid, work_date in keys:
+            by_day.setdefault(work_date, set()).add(fid)
+
+        written = 0
+        for work_date, faculty_ids in sorted(by_day.items()):
+            start, end = self._window(work_date)
+            success, events = self.db_manager.get_events_between(start, end, sorted(faculty_ids))
+            if not success:
+                return False, events
+            rows = compute_daily_rollups(events, {work_date}, min(datetime.now(), end))
+            success, result = self.db_manager.upsert_daily_rollups(rows)
+            if not success:
+                return False, result
+            written += result
+            if on_written:
+                on_written(work_date, faculty_ids)
+        return True, written
+
+    def on_punches_flushed(self, batch):
+        """PunchJournal listener: batch is a list of (FacultyID, Action, Timestamp)."""
+        # A punch can also close (or orphan) a shift that started the day before.
+        keys = set()
+        for fid, _, timestamp in batch:
+            keys.add((fid, timestamp.date()))
+            keys.add((fid, (timestamp - shift_engine.MAX_SESSION).date()))
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO rollup_pending (faculty_id, work_date) VALUES (?, ?)",
+                                   [(fid, work_date.isoformat()) for fid, work_date in keys])
+            self._conn.commit()
+            self._refresh_pending()
+            self._count_pending()
+
+    def retry_pending(self):
+        """Re-summarizes pairs left over from failed refreshes; matches PunchJournal.drained_listeners.
+        Backs off while refreshes keep failing."""
+        with self._lock:
+            if clock.monotonic() >= self._retry_at:
+                self._refresh_pending()
+                self._count_pending()
+
+    def pending_count(self):
+        """Faculty-days waiting for a refresh; read without waiting on one in progress."""
+        return self._pending
+
+    def _count_pending(self):
+        self._pending = self._conn.execute("SELECT COUNT(*) FROM rollup_pending").fetchone()[0]
+
+    def _refresh_pending(self):
+        rows = self._conn.execute("SELECT faculty_id, work_date FROM rollup_pending").fetchall()
+        if not rows:
+            return
+        keys = [(fid, date.fromisoformat(work_date)) for fid, work_date in rows]
+        success, result = self.refresh(keys, on_written=self._clear_pending)
+        if success:
+            self.last_error = None
+            self._backoff = 0.0
+            self._retry_at = 0.0
+        else:
+            self.last_error = result
+            self._backoff = min(max(self._backoff * 2, 1.0), self.max_backoff)
+            self._retry_at = clock.monotonic() + self._backoff
+            log.error(f"Rollup Error: {result} ({len(rows)} faculty-days kept for retry)")
+
+    def _clear_pending(self, work_date, faculty_ids):
+        self._conn.executemany("DELETE FROM rollup_pending WHERE faculty_id = ? AND work_date = ?",
+                               [(fid, work_date.isoformat()) for fid in faculty_ids])
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def rebuild(self, start_date, end_date, progress=None):
+        """Recomputes every rollup row for start_date..end_date (inclusive)."""
+        written = 0
+        work_date = start_date
+        while work_date <= end_date:
+            start, end = self._window(work_date)
+            success, events = self.db_manager.get_events_between(start, end)
+            if not success:
+                return False, events
+            rows = compute_daily_rollups(events, {work_date}, min(datetime.now(), end))
+            success, result = self.db_manager.upsert_daily_rollups(rows)
+            if not success:
+                return False, result
+            written += result
+            if progress:
+                progress(work_date, written)
+            work_date += timedelta(days=1)
+        return True, written
+
+    @staticmethod
+    def _window(work_date):
+        """Punches that can affect work_date's row: the day itself plus MAX_SESSION
+        either side, for overnight shifts."""
+        start = datetime.combine(work_date, time())
+        return start - shift_engine.MAX_SESSION, start + timedelta(days=1) + shift_engine.MAX_SESSION
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the dbo.AttendanceDaily rollup table.")
+    parser.add_argument('--start', required=True, help="First day (YYYY-MM-DD).")
+    parser.add_argument('--end', help="Last day, inclusive (YYYY-MM-DD, default today).")
+    parser.add_argument('--server', default=DEFAULT_SERVER)
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    args = parser.parse_args()
+
+    start_date = datetime.strptime(args.start, '%Y-%m-%d').date()
+    end_date = datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else datetime.now().date()
+
+    db_manager = DatabaseManager(server=args.server, database=args.database, pool_size=1)
+    try:
+        success, result = RollupManager(db_manager).rebuild(
+            start_date, end_date, progress=lambda day, total: print(f"  {day}: {total} rows so far"))
+        print(f"Rebuilt {result} rollup rows." if success else f"Error: {result}")
+    finally:
+        db_manager.close()
+
+if __name__ == "__main__":
+    main()
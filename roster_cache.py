@@ -0,0 +1,112 @@
+# roster_cache.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+class RosterCache:
+    """In-memory FacultyID -> Faculty cache in front of DatabaseManager.
+
+    Entries are evicted least-recently-used once max_size is reached and
+    expire after ttl seconds, though an expired entry is still served while
+    the server cannot be reached. Unknown IDs are cached too (for negative_ttl
+    seconds) so repeated bad badge reads do not hit the server.
+    """
+
+    def __init__(self, db_manager, max_size=20000, ttl=3600.0, negative_ttl=30.0):
+        self.db_manager = db_manager
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self._entries = OrderedDict()  # faculty_id -> (Faculty or None, expires_at)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.stale_hits = 0  # expired entries served because the lookup failed
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, faculty_id):
+        """Returns the Faculty for an ID, or None if it is unknown or the lookup failed."""
+        success, faculty = self.lookup(faculty_id)
+        return faculty if success else None
+
+    def lookup(self, faculty_id):
+        """Like get(), but returns (success, Faculty or None) so a failed query can be
+        told apart from an unknown ID. Only queries the DB on a miss; while the
+        DB is unreachable an expired entry is served rather than failing."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(faculty_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(faculty_id)
+                if entry[0] is None:
+                    self.negative_hits += 1
+                else:
+                    self.hits += 1
+                return True, entry[0]
+            self.misses += 1
+
+        success, faculty = self.db_manager.lookup_faculty(faculty_id)
+        if not success:
+            # Never cache a failed lookup as "unknown ID".
+            log.error(f"Read Error: {faculty}")
+            if entry is not None and entry[0] is not None:
+                with self._lock:
+                    self.stale_hits += 1
+                return True, entry[0]
+            return False, faculty
+        self.put(faculty_id, faculty)
+        return True, faculty
+
+    def put(self, faculty_id, faculty):
+        """Stores a Faculty (or None for a known-missing ID)."""
+        ttl = self.ttl if faculty is not None else self.negative_ttl
+        with self._lock:
+            self._entries[faculty_id] = (faculty, time.monotonic() + ttl)
+            self._entries.move_to_end(faculty_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def warm_up(self):
+        """Bulk-loads the whole roster in one query. Returns the number of entries loaded."""
+        roster = self.db_manager.load_all_faculty()
+        for faculty in roster[:self.max_size]:
+            self.put(faculty.faculty_id, faculty)
+        return min(len(roster), self.max_size)
+
+    def add_faculty(self, faculty_id, full_name, department):
+        """Write-through wrapper around DatabaseManager.add_faculty."""
+        success, result = self.db_manager.add_faculty(faculty_id, full_name, department)
+        if success:
+            self.put(faculty_id, self.db_manager.make_faculty(faculty_id, full_name, department))
+        return success, result
+
+    def invalidate(self, faculty_id=None):
+        """Drops one entry, or the whole cache when no ID is given."""
+        with self._lock:
+            if faculty_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(faculty_id, None)
+
+    def stats(self):
+        """Hit/miss counters for sizing the cache."""
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'stale_hits': self.stale_hits,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            }
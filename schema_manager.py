@@ -0,0 +1,131 @@
+# schema_manager.py
+
+import argparse
+from db_manager import DatabaseManager, DEFAULT_SERVER, DEFAULT_DATABASE
+
+def _create_index(name, table, definition):
+    """Idempotent CREATE INDEX, so a migration can be re-run against a database that already has it."""
+    return f"""
+    IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{name}' AND object_id = OBJECT_ID('{table}'))
+        CREATE NONCLUSTERED INDEX {name} ON {table} {definition};
+    """
+
+# (version, description, sql). Append new entries; never edit ones that have shipped.
+MIGRATIONS = [
+    (1, "Attendance (FacultyID, Timestamp): per-faculty last action / previous check-in lookups",
+     _create_index('IX_Attendance_FacultyID_Timestamp', 'dbo.Attendance',
+                   '(FacultyID, Timestamp) INCLUDE (Action)')),
+    (2, "Attendance (Timestamp): half-open date-range scans for analytics and incremental refresh",
+     _create_index('IX_Attendance_Timestamp', 'dbo.Attendance',
+                   '(Timestamp) INCLUDE (FacultyID, Action)')),
+    (3, "Faculty (FullName): name-ordered report",
+     _create_index('IX_Faculty_FullName', 'dbo.Faculty',
+                   '(FullName) INCLUDE (Department)')),
+    (4, "Faculty (Department): per-department analytics and filters",
+     _create_index('IX_Faculty_Department', 'dbo.Faculty',
+                   '(Department) INCLUDE (FullName)')),
+    (5, "AttendanceDaily: per-faculty daily rollups maintained by rollup.py",
+     """
+     IF OBJECT_ID('dbo.AttendanceDaily', 'U') IS NULL
+         CREATE TABLE dbo.AttendanceDaily (
+             FacultyID NVARCHAR(50) NOT NULL,
+             WorkDate DATE NOT NULL,
+             FirstIn DATETIME NULL,
+             LastIn DATETIME NULL,
+             LastOut DATETIME NULL,
+             LastAction NVARCHAR(20) NULL,
+             LastActionTime DATETIME NULL,
+             CheckIns INT NOT NULL DEFAULT 0,
+             CheckOuts INT NOT NULL DEFAULT 0,
+             WorkedSeconds INT NOT NULL DEFAULT 0,
+             OnTime BIT NOT NULL DEFAULT 0,
+             UpdatedAt DATETIME NOT NULL DEFAULT GETDATE(),
+             CONSTRAINT PK_AttendanceDaily PRIMARY KEY (FacultyID, WorkDate)
+         );
+     """ + _create_index('IX_AttendanceDaily_WorkDate', 'dbo.AttendanceDaily',
+                         '(WorkDate) INCLUDE (FirstIn, LastOut, WorkedSeconds, OnTime)')),
+    (6, "AttendanceDaily.OrphanPunches: missed check-ins/check-outs found by shift_engine",
+     """
+     IF COL_LENGTH('dbo.AttendanceDaily', 'OrphanPunches') IS NULL
+         ALTER TABLE dbo.AttendanceDaily ADD OrphanPunches INT NOT NULL
+             CONSTRAINT DF_AttendanceDaily_OrphanPunches DEFAULT 0;
+     """),
+]
+
+class SchemaManager:
+    """Creates and versions the MSSQL indexes and tables the application relies on.
+
+    (SQLiteBackend creates the equivalent schema itself.)
+    """
+
+    VERSION_TABLE_SQL = """
+    IF OBJECT_ID('dbo.SchemaVersion', 'U') IS NULL
+        CREATE TABLE dbo.SchemaVersion (
+            Version INT NOT NULL PRIMARY KEY,
+            Description NVARCHAR(200) NOT NULL,
+            AppliedAt DATETIME NOT NULL DEFAULT GETDATE()
+        );
+    """
+
+    def __init__(self, db_manager, migrations=MIGRATIONS):
+        self.db_manager = db_manager
+        self.migrations = sorted(migrations)
+
+    def current_version(self):
+        """Highest applied migration version (0 for a fresh database)."""
+        with self.db_manager.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(self.VERSION_TABLE_SQL)
+            conn.commit()
+            cursor.execute("SELECT ISNULL(MAX(Version), 0) FROM dbo.SchemaVersion")
+            return cursor.fetchone()[0]
+
+    def pending(self):
+        version = self.current_version()
+        return [m for m in self.migrations if m[0] > version]
+
+    def migrate(self, target=None):
+        """Applies pending migrations in order, each in its own transaction.
+
+        Returns (True, [applied versions]) or (False, error message).
+        """
+        applied = []
+        try:
+            for version, description, sql in self.pending():
+                if target is not None and version > target:
+                    break
+                with self.db_manager.connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(sql)
+                    cursor.execute("INSERT INTO dbo.SchemaVersion (Version, Description) VALUES (?, ?)",
+                                   (version, description[:200]))
+                    conn.commit()
+                applied.append(version)
+            return True, applied
+        except self.db_manager.errors as err:
+            return False, f"Migration failed after {applied}: {err}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply attendance database schema/index migrations.")
+    parser.add_argument('--server', default=DEFAULT_SERVER)
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    parser.add_argument('--status', action='store_true', help="Only list pending migrations.")
+    parser.add_argument('--target', type=int, help="Stop after this version.")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(server=args.server, database=args.database, pool_size=1)
+    try:
+        schema = SchemaManager(db_manager)
+        if args.status:
+            print(f"Current version: {schema.current_version()}")
+            for version, description, _ in schema.pending():
+                print(f"  pending {version}: {description}")
+            return
+
+        success, result = schema.migrate(args.target)
+        print(f"Applied migrations: {result}" if success else f"Error: {result}")
+    finally:
+        db_manager.close()
+
+if __name__ == "__main__":
+    main()
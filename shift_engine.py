@@ -0,0 +1,91 @@
+# shift_engine.py
+
+from collections import namedtuple
+from datetime import timedelta
+
+# Longest plausible shift; a Check-In left open longer than this is treated as a missed Check-Out.
+MAX_SESSION = timedelta(hours=16)
+# A repeated Check-In (or Check-Out) this soon after the last one is an accidental double tap.
+DOUBLE_TAP = timedelta(minutes=2)
+
+# Session kinds
+CLOSED = 'closed'            # Check-In paired with its Check-Out
+OPEN = 'open'                # Check-In still in progress
+MISSING_OUT = 'missing_out'  # orphan Check-In: no Check-Out within MAX_SESSION
+MISSING_IN = 'missing_in'    # orphan Check-Out: nothing open to close
+
+# check_in / check_out are None for the missing side of an orphan punch.
+Session = namedtuple('Session', 'faculty_id check_in check_out kind')
+
+DayTotal = namedtuple('DayTotal', 'worked_seconds sessions missed_check_outs missed_check_ins open')
+
+def pair_sessions(events, max_session=MAX_SESSION, double_tap=DOUBLE_TAP, now=None):
+    """Pairs time-ordered (FacultyID, Timestamp, Action) events into Sessions in one pass.
+
+    Faculty may be interleaved; only the open Check-In and last Check-Out per
+    faculty are remembered. A Check-In followed by another Check-In becomes a
+    MISSING_OUT session, a Check-Out with nothing open a MISSING_IN one, and a
+    pair further apart than max_session is split into both orphans. Shifts
+    crossing midnight pair normally. Check-Ins still open at the end are OPEN
+    if they started within max_session of `now` (None: always OPEN).
+    """
+    open_in = {}   # FacultyID -> Check-In time
+    last_out = {}  # FacultyID -> last Check-Out time
+
+    for fid, timestamp, action in events:
+        if action == 'Check-In':
+            started = open_in.get(fid)
+            if started is not None:
+                if timestamp - started <= double_tap:
+                    continue
+                yield Session(fid, started, None, MISSING_OUT)
+            open_in[fid] = timestamp
+
+        elif action == 'Check-Out':
+            started = open_in.pop(fid, None)
+            if started is None:
+                previous = last_out.get(fid)
+                if previous is None or timestamp - previous > double_tap:
+                    yield Session(fid, None, timestamp, MISSING_IN)
+            elif timestamp - started > max_session:
+                yield Session(fid, started, None, MISSING_OUT)
+                yield Session(fid, None, timestamp, MISSING_IN)
+            else:
+                yield Session(fid, started, timestamp, CLOSED)
+            last_out[fid] = timestamp
+
+    for fid, started in open_in.items():
+        in_progress = now is None or now - started <= max_session
+        yield Session(fid, started, None, OPEN if in_progress else MISSING_OUT)
+
+def daily_totals(sessions):
+    """Sums sessions per (FacultyID, work date) into DayTotals.
+
+    A session belongs to the day its Check-In falls on, so an overnight shift
+    counts in full toward the day it started; an orphan Check-Out counts
+    toward its own day.
+    """
+    totals = {}
+    for session in sessions:
+        key = (session.faculty_id, (session.check_in or session.check_out).date())
+        worked, count, missed_outs, missed_ins, is_open = totals.get(key, (0.0, 0, 0, 0, False))
+        if session.kind == CLOSED:
+            worked += (session.check_out - session.check_in).total_seconds()
+            count += 1
+        elif session.kind == OPEN:
+            is_open = True
+        elif session.kind == MISSING_OUT:
+            missed_outs += 1
+        else:
+            missed_ins += 1
+        totals[key] = DayTotal(worked, count, missed_outs, missed_ins, is_open)
+    return totals
+
+def latest_worked_seconds(totals):
+    """{FacultyID: worked seconds} for each faculty's latest day with a Check-In."""
+    latest = {}
+    for (fid, work_date), total in totals.items():
+        has_check_in = total.sessions or total.open or total.missed_check_outs
+        if has_check_in and (fid not in latest or work_date > latest[fid][0]):
+            latest[fid] = (work_date, total.worked_seconds)
+    return {fid: worked for fid, (_, worked) in latest.items()}
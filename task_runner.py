@@ -0,0 +1,116 @@
+# task_runner.py
+
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+class TaskRunner:
+    """Runs blocking work (database calls) on worker threads and hands the
+    results back to the Tk main thread.
+
+    Tasks submitted under a key can be cancelled as a group (e.g. when the
+    user navigates away from a frame) and repeated submissions while one is
+    still running are coalesced into a single follow-up run. Callbacks always
+    run on the UI thread, polled from the Tk event loop with after().
+    """
+
+    def __init__(self, root, max_workers=4, poll_interval=25):
+        self.root = root
+        self.poll_interval = poll_interval
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._results = queue.Queue()
+        self._generations = {}  # key -> generation; bumped on cancel so late results are dropped
+        self._running = {}      # key -> Future of the in-flight task
+        self._pending = {}      # key -> latest request that arrived while one was running
+        self._closed = False
+
+        self.root.after(self.poll_interval, self._poll)
+
+    def submit(self, key, fn, *args, on_success=None, on_error=None):
+        """Runs fn(*args) in the background.
+
+        key=None runs the task unconditionally. Otherwise, if a task with the
+        same key is already running, this request replaces any earlier queued
+        one and runs once the current task finishes.
+        """
+        request = (fn, args, on_success, on_error)
+        if key is not None and key in self._running:
+            self._pending[key] = request
+            return
+        self._start(key, request)
+
+    def cancel(self, key):
+        """Drops queued and in-flight work for a key; its callbacks will not run."""
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._pending.pop(key, None)
+        future = self._running.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def is_busy(self, key):
+        return key in self._running
+
+    def post(self, callback, *args):
+        """Schedules callback(*args) on the UI thread. Safe to call from any thread."""
+        self._results.put(('call', callback, args))
+
+    def shutdown(self):
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self, key, request):
+        fn, args, on_success, on_error = request
+        generation = self._generations.get(key, 0)
+
+        def run():
+            try:
+                value, ok = fn(*args), True
+            except Exception as err:
+                value, ok = err, False
+            self._results.put(('result', key, generation, ok, value, on_success, on_error))
+
+        future = self._executor.submit(run)
+        if key is not None:
+            self._running[key] = future
+
+    def _poll(self):
+        while True:
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if item[0] == 'call':
+                _, callback, args = item
+                self._invoke(callback, *args)
+                continue
+
+            _, key, generation, ok, value, on_success, on_error = item
+            stale = key is not None and generation != self._generations.get(key, 0)
+            if key is not None and not stale:
+                self._running.pop(key, None)
+
+            if not stale:
+                if ok:
+                    self._invoke(on_success, value)
+                elif on_error is not None:
+                    self._invoke(on_error, value)
+                else:
+                    log.error(f"Background Task Error: {value}")
+
+            if key is not None and key not in self._running and key in self._pending:
+                self._start(key, self._pending.pop(key))
+
+        if not self._closed:
+            self.root.after(self.poll_interval, self._poll)
+
+    def _invoke(self, callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as err:
+            log.exception(f"Callback Error: {err}")